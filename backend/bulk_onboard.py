@@ -0,0 +1,34 @@
+import argparse
+import json
+import database
+import models
+from services.bulk_onboarding import detect_format, iter_records, onboard_profiles
+from services.scheme_catalog import scheme_catalog
+
+# Bulk profile onboarding from an NDJSON or CSV file.
+# Each row needs a user_id or email of an existing user plus the ProfileCreate fields.
+parser = argparse.ArgumentParser(description="Onboard citizen profiles in bulk")
+parser.add_argument("path", help="NDJSON or CSV file of profiles")
+parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+parser.add_argument("--chunk-size", type=int, default=1000)
+parser.add_argument("--report", help="Write the full JSON report to this file")
+args = parser.parse_args()
+
+models.Base.metadata.create_all(bind=database.engine)
+db = database.SessionLocal()
+
+with open(args.path, encoding="utf-8", newline="") as f:
+    catalog = scheme_catalog.get(db)
+    report = onboard_profiles(db, iter_records(f, args.format or detect_format(args.path)), catalog, chunk_size=args.chunk_size)
+
+db.close()
+
+print(f"✓ Processed {report['processed']} rows in {report['elapsed_seconds']}s ({report['rows_per_second']} rows/s)")
+print(f"  Succeeded: {report['succeeded']}, Failed: {report['failed']}")
+for err in report["errors"][:20]:
+    print(f"  ✗ Row {err['row']}: {err['error']}")
+
+if args.report:
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {args.report}")
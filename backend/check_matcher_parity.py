@@ -0,0 +1,57 @@
+import time
+import database
+import models
+from services.batch_matcher import iter_profile_batches, match_scheme_batch
+from services.scheme_matcher import compile_catalog, match_schemes
+
+# Compares the vectorized matcher and the reverse (per-scheme) batch matcher
+# against the per-scheme reference loop for every profile in the database.
+db = database.SessionLocal()
+catalog = compile_catalog(db.query(models.Scheme).all())
+profiles = db.query(models.CitizenProfile).all()
+
+print(f"Schemes: {len(catalog)}, Profiles: {len(profiles)}")
+
+timings = {"loop": 0.0, "vectorized": 0.0}
+mismatches = 0
+reference = set()
+for p in profiles:
+    score = ((p.risk_score_health or 0.0) + (p.risk_score_financial or 0.0)) / 2
+    results = {}
+    for mode in timings:
+        start = time.perf_counter()
+        results[mode] = match_schemes(p, catalog, score, mode=mode)
+        timings[mode] += time.perf_counter() - start
+    reference.update((p.user_id, *m) for m in results["loop"])
+
+    if results["loop"] != results["vectorized"]:
+        mismatches += 1
+        print(f"✗ Mismatch for profile {p.id} (user {p.user_id})")
+        print(f"  loop:       {results['loop']}")
+        print(f"  vectorized: {results['vectorized']}")
+
+# Reverse matching: each scheme against all profiles at once
+start = time.perf_counter()
+reverse = set()
+batches = list(iter_profile_batches(db))
+for rule in catalog.rules:
+    for batch in batches:
+        mask, confidence, reason = match_scheme_batch(rule, batch)
+        reverse.update((batch.user_id[i], rule.id, float(confidence[i]), reason[i]) for i in mask.nonzero()[0])
+timings["reverse"] = time.perf_counter() - start
+
+if reverse != reference:
+    mismatches += 1
+    print(f"✗ Reverse matcher differs: {len(reverse - reference)} extra, {len(reference - reverse)} missing")
+    for row in sorted(reverse ^ reference)[:10]:
+        print(f"  {row}")
+
+for mode, elapsed in timings.items():
+    print(f"{mode:<12}: {elapsed * 1000:.2f} ms total")
+
+if mismatches:
+    print(f"\n✗ {mismatches} mismatches")
+else:
+    print("\n✓ Vectorized and reverse matchers match the reference loop")
+
+db.close()
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import database
+import models
+from services.ai_engine import ai_engine
+from services.scheme_matcher import MAX_CONFIDENCE, compile_catalog
+from services.scheme_ranking import model_input
+from services.scoring_pool import score_and_match
+
+# Checks that recommendations follow the model within each profile: model
+# scored schemes are ordered by model score, and confidences of model-scored
+# and rule-based (unknown to the encoder) schemes share one 0.8-0.99 scale.
+db = database.SessionLocal()
+catalog = compile_catalog(db.query(models.Scheme).all())
+profiles = db.query(models.CitizenProfile).all()
+
+# Low-risk profile whose rule-based confidence (0.81) used to outrank every model score
+low_risk = SimpleNamespace(**{c.name: None for c in models.CitizenProfile.__table__.columns})
+low_risk.__dict__.update(id=0, user_id=0, age=45, gender="Female", income=900000, occupation="Teacher",
+                         community="General", is_student="No", minority_status="No", disability_status=False,
+                         family_size=3, location_type="Urban", area_of_residence="Urban")
+profiles.append(low_risk)
+
+print(f"Schemes: {len(catalog)}, Profiles: {len(profiles)}, model: {ai_engine.model_version}")
+
+failures = 0
+mixed = 0
+for p in profiles:
+    _, _, matches = score_and_match(p, catalog)
+    names = [catalog.names[scheme_id] for scheme_id, _, _ in matches]
+    model_scores = ai_engine.predict_scheme_scores_batch([(model_input(p), names)])[0]
+    confidences = [confidence for _, confidence, _ in matches]
+    scored = [s for s in model_scores if s is not None]
+    mixed += 0 < len(scored) < len(matches)
+
+    problems = []
+    if confidences != sorted(confidences, reverse=True):
+        problems.append("not ordered by confidence")
+    if scored != sorted(scored, reverse=True):
+        problems.append("model-scored schemes not in model order")
+    if any(not 0.8 <= c <= MAX_CONFIDENCE for c in confidences):
+        problems.append("confidence outside 0.8-0.99")
+    if problems:
+        failures += 1
+        print(f"✗ Profile {p.id} (user {p.user_id}): {', '.join(problems)}")
+        for name, score, confidence in zip(names, model_scores, confidences):
+            print(f"  {confidence:.3f}  model={score}  {name}")
+
+print("\nLow-risk profile (45, Female, 900000, Teacher):")
+_, _, matches = score_and_match(low_risk, catalog)
+names = [catalog.names[scheme_id] for scheme_id, _, _ in matches]
+model_scores = ai_engine.predict_scheme_scores_batch([(model_input(low_risk), names)])[0]
+for name, score, (_, confidence, _) in zip(names, model_scores, matches):
+    source = "rule-based" if score is None else f"model {score:.3f}"
+    print(f"  {confidence:.3f}  {source:<12} {name}")
+
+print(f"\nProfiles with both model-scored and rule-based matches: {mixed}")
+if failures:
+    print(f"✗ {failures} profiles ranked inconsistently")
+else:
+    print("✓ Every profile's matches follow the model order on one confidence scale")
+
+db.close()
@@ -1,10 +1,14 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
+import os
 import traceback
 import models
 import database
-from routes import auth, citizen, schemes, chat
+from routes import auth, citizen, schemes, chat, admin
+from services import inference_batcher, metrics
+from services.ai_engine import ai_engine, scheme_batcher
+from services.scoring_pool import scoring_pool
 
 # Create tables
 models.Base.metadata.create_all(bind=database.engine)
@@ -32,6 +36,32 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+@app.on_event("startup")
+def warm_up_model():
+    # The risk model otherwise loads on the first request that needs it
+    if os.getenv("AI_WARMUP", "0") == "1":
+        ai_engine.warm_up()
+    # Follow version switches made by other workers (AI_MODEL_WATCH_INTERVAL)
+    ai_engine.start_watcher()
+
+@app.on_event("startup")
+async def start_micro_batcher():
+    if inference_batcher.ENABLED:
+        scheme_batcher.start()
+
+@app.on_event("shutdown")
+async def stop_micro_batcher():
+    await scheme_batcher.stop()
+    scoring_pool.shutdown()
+
+@app.middleware("http")
+async def add_model_version_header(request: Request, call_next):
+    response = await call_next(request)
+    version = ai_engine.loaded_version()
+    if version:
+        response.headers["X-Model-Version"] = version
+    return response
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     print("GLOBAL EXCEPTION CAUGHT:")
@@ -45,7 +75,17 @@ app.include_router(auth.router)
 app.include_router(citizen.router)
 app.include_router(schemes.router)
 app.include_router(chat.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Citizen Digital DNA API"}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    for cache, stats in ai_engine.cache_stats().items():
+        metrics.set_gauge("ai_score_cache_size", stats["size"], cache=cache)
+        metrics.set_gauge("ai_score_cache_hits", stats["hits"], cache=cache)
+        metrics.set_gauge("ai_score_cache_misses", stats["misses"], cache=cache)
+        metrics.set_gauge("ai_score_cache_hit_rate", stats["hit_rate"], cache=cache)
+    return metrics.render()
@@ -0,0 +1,25 @@
+import json
+import database
+import models
+from services.eligibility_rules import translate_text_rules
+
+# One-off translation of free-text eligibility rules into the structured JSON
+# format. The original text is kept under the "text" key. Safe to re-run:
+# schemes that already have structured rules are skipped.
+db = database.SessionLocal()
+schemes = db.query(models.Scheme).all()
+
+translated = 0
+for s in schemes:
+    rules = translate_text_rules(s)
+    if rules is None:
+        print(f"- {s.scheme_name}: already structured")
+        continue
+    s.eligibility_rules = json.dumps(rules)
+    translated += 1
+    print(f"✓ {s.scheme_name}: {s.eligibility_rules}")
+
+db.commit()
+db.close()
+print(f"\n✓ Translated {translated} of {len(schemes)} schemes")
+print("Restart the API (or wait for SCHEME_CATALOG_TTL) to pick up the new rules.")
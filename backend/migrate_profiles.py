@@ -20,6 +20,9 @@ add_column_if_not_exists("citizen_profiles", "disability_cert", "VARCHAR(255)")
 add_column_if_not_exists("citizen_profiles", "education_cert", "VARCHAR(255)")
 add_column_if_not_exists("citizen_profiles", "bpl_cert", "VARCHAR(255)")
 
+# Recommendation fingerprint (skip recomputation for unchanged profiles)
+add_column_if_not_exists("citizen_profiles", "match_fingerprint", "VARCHAR(64)")
+
 conn.commit()
 conn.close()
 print("\n✓ Database migration completed successfully")
@@ -0,0 +1,16 @@
+from sqlalchemy import Index
+
+import database
+import models
+
+# Adds the scheme prefilter indexes to an existing database.
+# create_all() only creates indexes together with new tables.
+for index in models.Scheme.__table__.indexes:
+    index.create(bind=database.engine, checkfirst=True)
+    print(f"✓ {index.name}")
+
+# The prefilter compares lower(required_gender), which this index cannot serve
+Index("ix_schemes_required_gender", models.Scheme.required_gender).drop(bind=database.engine, checkfirst=True)
+print("✓ Dropped ix_schemes_required_gender (if present)")
+
+print("\n✓ Scheme indexes are in place")
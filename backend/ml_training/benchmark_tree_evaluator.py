@@ -0,0 +1,79 @@
+"""
+Parity and latency benchmark: exported NumPy tree evaluator vs the XGBoost
+booster of the CURRENT model version, on synthetic_dataset.csv. Run from the
+backend directory:
+
+    python ml_training/benchmark_tree_evaluator.py
+"""
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.ai_engine import ai_engine
+from services.model_artifacts import load_state
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'synthetic_dataset.csv')
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..')
+TOLERANCE = 1e-5
+
+
+def _per_call_us(fn, repeat=500):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def _startup_seconds(mode):
+    # Fresh interpreter, so imports (xgboost, sklearn) are part of the cost
+    env = dict(os.environ, AI_INFERENCE_MODE=mode)
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "from services.ai_engine import ai_engine; assert ai_engine.is_ready()"],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True,
+    )
+    return time.perf_counter() - start
+
+
+def benchmark():
+    if not ai_engine.is_ready() or ai_engine.state.booster is None:
+        print("✗ Need a model version loaded with the booster (AI_INFERENCE_MODE=inplace)")
+        return False
+
+    booster = ai_engine.state.booster
+    trees = load_state(ai_engine.model_version, mode="trees").trees
+
+    # 'None' is a valid occupation, so disable default NA handling
+    df = pd.read_csv(DATA_PATH, na_values=[], keep_default_na=False)
+    matrix = np.array([ai_engine._encode(row) for row in df.to_dict('records')], dtype=np.float32)
+
+    expected = booster.inplace_predict(matrix)
+    actual = trees.predict(matrix)
+    diff = np.abs(expected - actual)
+
+    print(f"Rows: {len(matrix)}, trees: {len(trees.roots)}, depth: {trees.max_depth}")
+    print("-" * 50)
+    print(f"{'':<22} | {'booster':>10} | {'numpy trees':>11}")
+    print("-" * 50)
+    row = matrix[:1]
+    print(f"{'single row (µs)':<22} | {_per_call_us(lambda: booster.inplace_predict(row)):>10.1f} | {_per_call_us(lambda: trees.predict(row)):>11.1f}")
+    batch = matrix[:1000]
+    print(f"{'1000 rows (µs)':<22} | {_per_call_us(lambda: booster.inplace_predict(batch), 50):>10.1f} | {_per_call_us(lambda: trees.predict(batch), 50):>11.1f}")
+    print(f"{'startup (s)':<22} | {_startup_seconds('inplace'):>10.2f} | {_startup_seconds('trees'):>11.2f}")
+    print("-" * 50)
+
+    if diff.max() > TOLERANCE:
+        print(f"✗ {int((diff > TOLERANCE).sum())} rows differ (max diff {diff.max():.2e})")
+        return False
+    print(f"✓ All {len(matrix)} predictions match (max diff {diff.max():.2e})")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if benchmark() else 1)
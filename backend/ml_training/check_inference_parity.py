@@ -0,0 +1,63 @@
+"""
+Parity check for the pandas-free inference path.
+
+Encodes every row of synthetic_dataset.csv with AIEngine and compares the
+booster in-place prediction (float32 array) with the original DataFrame path.
+Run from the backend directory:
+
+    python ml_training/check_inference_parity.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.ai_engine import ai_engine
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'synthetic_dataset.csv')
+TOLERANCE = 1e-6
+
+
+def check_parity():
+    if not ai_engine.is_ready():
+        print("✗ Model not loaded, nothing to compare")
+        return False
+
+    # 'None' is a valid occupation, so disable default NA handling
+    df = pd.read_csv(DATA_PATH, na_values=[], keep_default_na=False)
+    rows = df.to_dict('records')
+    matrix = np.array([ai_engine._encode(row) for row in rows], dtype=np.float32)
+    print(f"Encoded {len(rows)} rows from {DATA_PATH}")
+
+    timings = {}
+    predictions = {}
+    for mode in ["dataframe", "inplace"]:
+        start = time.perf_counter()
+        predictions[mode] = np.asarray(ai_engine.predict_matrix(matrix, mode=mode), dtype=np.float64)
+        timings[mode] = time.perf_counter() - start
+
+    diff = np.abs(predictions["dataframe"] - predictions["inplace"])
+    for mode, elapsed in timings.items():
+        print(f"  {mode:<10} {elapsed * 1000:8.1f} ms")
+
+    # Single-row latency, the path profile saves take
+    row = matrix[:1]
+    for mode in ["dataframe", "inplace"]:
+        start = time.perf_counter()
+        for _ in range(200):
+            ai_engine.predict_matrix(row, mode=mode)
+        print(f"  {mode:<10} {(time.perf_counter() - start) / 200 * 1e6:8.1f} µs per single-row call")
+
+    if diff.max() > TOLERANCE:
+        print(f"✗ {int((diff > TOLERANCE).sum())} rows differ (max diff {diff.max():.2e})")
+        return False
+    print(f"✓ All {len(rows)} predictions match (max diff {diff.max():.2e})")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check_parity() else 1)
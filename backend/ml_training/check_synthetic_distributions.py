@@ -0,0 +1,75 @@
+"""
+Checks that synthetic_data.generate_dataset() draws the same distributions as
+the generate_row() reference and compares their throughput:
+
+    python ml_training/check_synthetic_distributions.py [rows]
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from synthetic_data import VOCABULARIES, generate_dataset
+from train_model import generate_row
+
+ROWS = 100000
+# Largest allowed difference of a category share / a per-scheme statistic
+SHARE_TOLERANCE = 0.01
+STAT_TOLERANCE = 0.025
+
+
+def _report(name, diff, tolerance):
+    ok = diff <= tolerance
+    print(f"{'✓' if ok else '✗'} {name}: max diff {diff:.4f} (tolerance {tolerance})")
+    return ok
+
+
+def compare(reference, vectorized):
+    ok = True
+    for column in VOCABULARIES:
+        shares = pd.concat([
+            reference[column].astype(str).value_counts(normalize=True),
+            vectorized[column].astype(str).value_counts(normalize=True),
+        ], axis=1).fillna(0)
+        ok &= _report(f"{column} shares", (shares.iloc[:, 0] - shares.iloc[:, 1]).abs().max(), SHARE_TOLERANCE)
+
+    # Numeric columns relative to their scale: overall deciles and per-scheme means
+    deciles = np.linspace(0.1, 0.9, 9)
+    for column, scale in [('age', 90), ('income_annum', 2000000), ('risk_score', 1)]:
+        q = [df[column].quantile(deciles) / scale for df in (reference, vectorized)]
+        ok &= _report(f"{column} deciles", (q[0] - q[1]).abs().max(), STAT_TOLERANCE)
+        means = [df.groupby(df['scheme_name'].astype(str))[column].mean() / scale for df in (reference, vectorized)]
+        ok &= _report(f"{column} mean per scheme", (means[0] - means[1]).abs().max(), STAT_TOLERANCE)
+
+    disqualified = [
+        df.groupby(df['scheme_name'].astype(str))['risk_score'].apply(lambda s: (s == 0).mean())
+        for df in (reference, vectorized)
+    ]
+    ok &= _report("disqualified share per scheme", (disqualified[0] - disqualified[1]).abs().max(), STAT_TOLERANCE)
+    return ok
+
+
+def main(rows=ROWS):
+    random.seed(0)
+    start = time.perf_counter()
+    reference = pd.DataFrame([generate_row() for _ in range(rows)])
+    row_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = generate_dataset(rows, seed=0)
+    vector_seconds = time.perf_counter() - start
+
+    print(f"generate_row():     {rows / row_seconds:>12,.0f} rows/s")
+    print(f"generate_dataset(): {rows / vector_seconds:>12,.0f} rows/s ({row_seconds / vector_seconds:.0f}x)")
+    ok = compare(reference, vectorized)
+    print("✓ Distributions match" if ok else "✗ Distributions differ")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(*(int(a) for a in sys.argv[1:2])) else 1)
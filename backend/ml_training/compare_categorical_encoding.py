@@ -0,0 +1,79 @@
+"""
+Compares ordinal (label-encoded) and native categorical training on the same
+generated dataset: model size, held-out accuracy and serving latency through
+AIEngine. Models are written to a temporary directory, so the CURRENT model
+is not touched:
+
+    python ml_training/compare_categorical_encoding.py [rows]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.ai_engine import AIEngine, CANARY_PROFILES
+from services.model_artifacts import BOOSTER_FILE, TREES_FILE, version_dir, write_artifacts
+from sharded_dataset import generate
+from train_model import SCHEMES, train_in_memory
+
+ROWS = 200000
+ENCODINGS = ["ordinal", "native"]
+
+
+def _per_call_us(fn, repeat=300):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def measure(base_dir, version, booster):
+    trees = booster.trees_to_dataframe()
+    directory = version_dir(version, base_dir)
+    result = {
+        "model.ubj (KB)": os.path.getsize(os.path.join(directory, BOOSTER_FILE)) / 1024,
+        "trees.npz (KB)": os.path.getsize(os.path.join(directory, TREES_FILE)) / 1024,
+        "split nodes": int((trees["Feature"] != "Leaf").sum()),
+    }
+
+    profiles = CANARY_PROFILES * 125
+    for mode in ["inplace", "trees"]:
+        engine = AIEngine(inference_mode=mode, cache_size=1, artifacts_dir=base_dir)
+        state = engine.warm_up()
+        rows = np.array([engine._encode(engine._build_features(p), state) for p in profiles], dtype=np.float32)
+        result[f"{mode} 1 row (µs)"] = _per_call_us(lambda: engine.predict_matrix(rows[:1], state=state))
+        result[f"{mode} 1000 rows (µs)"] = _per_call_us(lambda: engine.predict_matrix(rows, state=state), repeat=50)
+    return result
+
+
+def main(rows=ROWS):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        dataset_dir = os.path.join(tmp, "dataset")
+        generate(rows, seed=0, workers=1, out_dir=dataset_dir)
+        for encoding in ENCODINGS:
+            base_dir = os.path.join(tmp, encoding)
+            booster, vocabularies, feature_names, mse = train_in_memory(dataset_dir, encoding)
+            version = write_artifacts(
+                booster, vocabularies, feature_names, base_dir=base_dir,
+                metadata={'schemes_list': SCHEMES, 'mse': float(mse), 'categorical_encoding': encoding},
+            )
+            results[encoding] = {"test MSE": mse, **measure(base_dir, version, booster)}
+
+    print("-" * 50)
+    print(f"{'':<22} | {'ordinal':>10} | {'native':>10}")
+    print("-" * 50)
+    for metric in results["ordinal"]:
+        values = [results[encoding][metric] for encoding in ENCODINGS]
+        fmt = "{:>10.5f}" if metric == "test MSE" else "{:>10}" if metric == "split nodes" else "{:>10.1f}"
+        print(f"{metric:<22} | " + " | ".join(fmt.format(v) for v in values))
+    print("-" * 50)
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
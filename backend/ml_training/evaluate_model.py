@@ -1,60 +1,82 @@
+import argparse
 import pandas as pd
 import numpy as np
-import pickle
 import os
+import sys
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
-def evaluate():
-    # Paths
-    BASE_DIR = os.path.dirname(__file__)
-    DATA_PATH = os.path.join(BASE_DIR, 'synthetic_dataset.csv')
-    MODEL_PATH = os.path.join(BASE_DIR, '../ml_models/risk_model.pkl')
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-    if not os.path.exists(DATA_PATH):
-        print(f"Error: Dataset not found at {DATA_PATH}")
-        return
-    
-    if not os.path.exists(MODEL_PATH):
-        print(f"Error: Model not found at {MODEL_PATH}")
-        return
+from services.model_artifacts import ARTIFACTS_DIR, load_state
+from sharded_dataset import MANIFEST_FILE, encode_frame, read_columns
+from synthetic_data import VOCABULARIES
+
+BASE_DIR = os.path.dirname(__file__)
+DATASET_DIR = os.path.join(BASE_DIR, 'synthetic_dataset')
+DATA_PATH = os.path.join(BASE_DIR, 'synthetic_dataset.csv')
 
-    print(f"Loading data from {DATA_PATH}...")
+def load_dataset(dataset_dir=DATASET_DIR, csv_path=DATA_PATH):
+    """
+    Dictionary-encoded columns and their vocabularies: memory-mapped from the
+    columnar dataset, or parsed once from the CSV when there is none.
+    """
+    if os.path.exists(os.path.join(dataset_dir, MANIFEST_FILE)):
+        print(f"Loading data from {dataset_dir}...")
+        return read_columns(dataset_dir)
+    if not os.path.exists(csv_path):
+        return None, None
+    print(f"Loading data from {csv_path}...")
     # 'None' is a valid string in our dataset (e.g. for Occupation), so we disable default NA handling for it
-    df = pd.read_csv(DATA_PATH, na_values=[], keep_default_na=False)
+    df = pd.read_csv(csv_path, na_values=[], keep_default_na=False)
+    return encode_frame(df), VOCABULARIES
 
-    print(f"Loading model from {MODEL_PATH}...")
-    with open(MODEL_PATH, 'rb') as f:
-        artifacts = pickle.load(f)
-    
-    model = artifacts['model']
-    encoders = artifacts['encoders']
-    
-    # Preprocessing using saved encoders to ensure consistency
-    categorical_cols = ['scheme_name', 'gender', 'marital_status', 'state', 'area_of_residence', 
-                        'social_category', 'minority_status', 'disability_status', 'bpl_category', 
-                        'is_student', 'employment_status', 'occupation', 'single_parent_child']
+def label_counts(codes, labels):
+    """(label, count) pairs, most frequent first, like Series.value_counts()."""
+    counts = np.bincount(codes, minlength=len(labels))
+    return [(labels[i], int(counts[i])) for i in np.argsort(-counts, kind='stable') if counts[i]]
 
-    print("Transforming features...")
-    for col in categorical_cols:
-        if col in encoders:
-            le = encoders[col]
-            # Use apply to handle potentially unseen labels gracefully (though unlikely with same dataset)
-            # mapping known classes to transform, else default to 0 or similar could be done, 
-            # but for metric evaluation on the same dataset, direct transform is standard.
-            df[col] = le.transform(df[col])
-        else:
-            print(f"Warning: No encoder found for {col}")
+def evaluate(dataset_dir=DATASET_DIR, csv_path=DATA_PATH):
+    columns, vocabularies = load_dataset(dataset_dir, csv_path)
+    if columns is None:
+        print(f"Error: Dataset not found at {dataset_dir} or {csv_path}")
+        return
 
-    X = df.drop(['user_id', 'risk_score'], axis=1)
-    y = df['risk_score']
+    print(f"Loading model from {os.path.abspath(ARTIFACTS_DIR)}...")
+    try:
+        state = load_state()
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return
+    print(f"Model version: {state.version}")
+    booster = state.booster
+    features = state.feature_names
 
-    # Reproduce the exact split used in training
+    # Reproduce the exact split used in training (it only depends on the row count)
     print("Splitting data (test_size=0.2, random_state=42)...")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    n_rows = len(columns['risk_score'])
+    _, test_idx = train_test_split(np.arange(n_rows), test_size=0.2, random_state=42)
+
+    # Preprocessing using saved encoder vocabularies to ensure consistency:
+    # one lookup table per column maps dataset codes to model codes
+    print("Transforming features...")
+    X_test = np.empty((len(test_idx), len(features)), dtype=np.float32)
+    for j, feature in enumerate(features):
+        values = columns[feature][test_idx]
+        if feature in vocabularies:
+            lookup = state.lookups.get(feature)
+            if lookup is None:
+                print(f"Warning: No encoder found for {feature}")
+                X_test[:, j] = np.nan
+                continue
+            table = np.array([lookup.get(label, state.unseen_codes[feature]) for label in vocabularies[feature]], dtype=np.float32)
+            X_test[:, j] = table[values]
+        else:
+            X_test[:, j] = values
+    y_test = np.asarray(columns['risk_score'][test_idx])
 
     print(f"Evaluating on {len(X_test)} test samples...")
-    preds = model.predict(X_test)
+    preds = booster.inplace_predict(X_test)
 
     # Metrics Calculation
     mse = mean_squared_error(y_test, preds)
@@ -79,10 +101,10 @@ def evaluate():
     print("   FEATURE IMPORTANCE ANALYSIS")
     print("="*40)
     
-    # Get importance (Gain is usually the default and most relevant for 'weight' interpretation in tree context, 
-    # but feature_importances_ property gives Gini importance/Gain)
-    importances = model.feature_importances_
-    features = X.columns
+    # Normalized average gain per feature, as XGBRegressor.feature_importances_ reports it
+    gains = booster.get_score(importance_type='gain')
+    importances = np.array([gains.get(f, 0.0) for f in features])
+    importances = importances / importances.sum()
     
     importance_df = pd.DataFrame({'Feature': features, 'Importance': importances})
     importance_df = importance_df.sort_values(by='Importance', ascending=False)
@@ -95,29 +117,23 @@ def evaluate():
     print("   DATASET IMBALANCE CHECK")
     print("="*40)
     
-    # Check Scheme Distribution
+    # Check Scheme Distribution: counted on the dictionary codes, no second parse
     print("Scheme Distribution:")
-    scheme_counts = df['scheme_name'].value_counts(normalize=True) * 100
-    # Mapping back to names if possible, but we transformed df inplace earlier. 
-    # Let's reload concise raw data for readability or just use the indices if we must.
-    # To keep it simple, we reload the raw CSV for accurate counts of labels.
-    df_raw = pd.read_csv(DATA_PATH, na_values=[], keep_default_na=False)
-    
-    scheme_counts = df_raw['scheme_name'].value_counts()
-    total_samples = len(df_raw)
+    scheme_counts = label_counts(columns['scheme_name'], vocabularies['scheme_name'])
+    total_samples = n_rows
     
     # Print top 10 and bottom 5 to check disparity
     print(f"Total Samples: {total_samples}")
     print("-" * 40)
     print(f"{'Scheme Name':<45} | {'Count':<6} | {'%':<5}")
     print("-" * 40)
-    for scheme, count in scheme_counts.items():
+    for scheme, count in scheme_counts:
         print(f"{scheme:<45} | {count:<6} | {count/total_samples*100:.1f}%")
         
     print("-" * 40)
     print("Social Category Distribution:")
-    cat_counts = df_raw['social_category'].value_counts()
-    for cat, count in cat_counts.items():
+    cat_counts = label_counts(columns['social_category'], vocabularies['social_category'])
+    for cat, count in cat_counts:
         print(f"{cat:<15} | {count:<6} | {count/total_samples*100:.1f}%")
 
     print("-" * 40)
@@ -126,9 +142,13 @@ def evaluate():
     print("\nSample Predictions vs Ground Truth (First 5):")
     print(f"{'Actual':<10} | {'Predicted':<10} | {'Diff':<10}")
     print("-" * 34)
-    for actual, pred in zip(y_test[:5].values, preds[:5]):
+    for actual, pred in zip(y_test[:5], preds[:5]):
         print(f"{actual:<10.4f} | {pred:<10.4f} | {abs(actual-pred):<10.4f}")
     print("-" * 34)
 
 if __name__ == "__main__":
-    evaluate()
+    parser = argparse.ArgumentParser(description="Evaluate the current risk model")
+    parser.add_argument("--dataset", default=DATASET_DIR, help="Columnar dataset directory (sharded_dataset.py)")
+    parser.add_argument("--csv", default=DATA_PATH, help="CSV dataset, used when the dataset directory does not exist")
+    args = parser.parse_args()
+    evaluate(args.dataset, args.csv)
@@ -0,0 +1,36 @@
+"""
+Converts a legacy pickled model (risk_model.pkl: XGBRegressor + LabelEncoders)
+into a versioned artifact directory (see services.model_artifacts) and makes
+it the CURRENT version. Only needed for models trained before train_model.py
+wrote artifacts itself:
+
+    python ml_training/export_artifacts.py [path/to/risk_model.pkl]
+"""
+import os
+import pickle
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.model_artifacts import ARTIFACTS_DIR, write_artifacts
+
+LEGACY_MODEL_PATH = os.path.join(os.path.dirname(__file__), '../ml_models/risk_model.pkl')
+
+
+def export(path=LEGACY_MODEL_PATH):
+    # Only unpickle files you trust
+    with open(path, 'rb') as f:
+        artifacts = pickle.load(f)
+
+    vocabularies = {feature: encoder.classes_.tolist() for feature, encoder in artifacts['encoders'].items()}
+    version = write_artifacts(
+        artifacts['model'].get_booster(),
+        vocabularies,
+        artifacts.get('feature_names', []),
+        metadata={"schemes_list": artifacts.get('schemes_list', []), "source": os.path.basename(path)},
+    )
+    print(f"✓ Exported {path} as model version {version} in {os.path.abspath(ARTIFACTS_DIR)}")
+
+
+if __name__ == "__main__":
+    export(*sys.argv[1:2])
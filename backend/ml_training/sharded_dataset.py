@@ -0,0 +1,255 @@
+"""
+Sharded, reproducible synthetic datasets in a columnar on-disk format.
+
+The dataset is cut into fixed-size shards. Shard i draws from its own seed
+stream, the i-th child of one np.random.SeedSequence, so every shard depends
+only on the root entropy, its index and its row count, never on which worker
+wrote it or how many workers ran. Re-running with the same seed, row count
+and shard size gives bit-identical files with any --workers value.
+
+    <out>/
+        manifest.json           root entropy, columns, vocabularies, shard sizes,
+                                seed stream and sha256 per shard
+        shard-00000/
+            scheme_name.npy     int8 codes into manifest["vocabularies"]["scheme_name"]
+            age.npy             numeric columns as plain arrays
+            ...
+        shard-00001/
+        ...
+
+Categorical columns are dictionary-encoded, and every column is one .npy
+file that is memory-mapped on read, so nothing is parsed. The "csv" format
+(one shard-NNNNN.csv per shard) and export_csv() remain for other tools.
+
+    python ml_training/sharded_dataset.py --rows 20000000 --seed 42 --workers 8
+    python ml_training/sharded_dataset.py --export-csv dataset.csv --out <dataset dir>
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from services.model_artifacts import sha256_file
+from synthetic_data import COLUMNS, VOCABULARIES, generate_columns
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'synthetic_dataset')
+DEFAULT_SHARD_ROWS = 1000000
+FORMATS = ["npy", "csv"]
+
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 2
+
+
+def shard_name(index, fmt="npy"):
+    return f"shard-{index:05d}" + (".csv" if fmt == "csv" else "")
+
+
+def shard_sizes(rows, shard_rows):
+    full, rest = divmod(rows, shard_rows)
+    return [shard_rows] * full + ([rest] if rest else [])
+
+
+def shard_seed(entropy, index):
+    """The index-th child of SeedSequence(entropy), as SeedSequence.spawn() makes it."""
+    return np.random.SeedSequence(entropy, spawn_key=(index,))
+
+
+def to_frame(columns, vocabularies=VOCABULARIES):
+    """DataFrame over dictionary-encoded columns; categoricals keep their codes."""
+    return pd.DataFrame({
+        column: pd.Categorical.from_codes(values, vocabularies[column]) if column in vocabularies else values
+        for column, values in columns.items()
+    })
+
+
+def encode_frame(df, vocabularies=VOCABULARIES):
+    """Dictionary-encodes a DataFrame of labels (e.g. a parsed CSV) into columns."""
+    columns = {}
+    for column in COLUMNS:
+        if column in vocabularies:
+            codes = pd.Categorical(df[column], categories=vocabularies[column]).codes
+            if (codes < 0).any():
+                raise ValueError(f"Unknown {column} labels: {sorted(set(df[column][codes < 0]))[:5]}")
+            columns[column] = codes.astype(np.int8)
+        else:
+            columns[column] = df[column].to_numpy()
+    return columns
+
+
+def _write_npy_shard(path, columns):
+    os.makedirs(path, exist_ok=True)
+    digest = hashlib.sha256()
+    for column in COLUMNS:
+        file = os.path.join(path, f"{column}.npy")
+        np.save(file, np.ascontiguousarray(columns[column]))
+        digest.update(sha256_file(file).encode())
+    return digest.hexdigest()
+
+
+def _write_csv_shard(path, columns):
+    to_frame(columns).to_csv(f"{path}.tmp", index=False)
+    os.replace(f"{path}.tmp", path)
+    return sha256_file(path)
+
+
+def write_shard(out_dir, index, rows, entropy, fmt="npy"):
+    """Generates and writes one shard; returns its manifest entry."""
+    started = time.perf_counter()
+    columns = generate_columns(rows, np.random.default_rng(shard_seed(entropy, index)))
+    path = os.path.join(out_dir, shard_name(index, fmt))
+    sha256 = _write_csv_shard(path, columns) if fmt == "csv" else _write_npy_shard(path, columns)
+    return {
+        "index": index,
+        "name": shard_name(index, fmt),
+        "rows": rows,
+        "spawn_key": [index],
+        # For npy shards: over the column file hashes, in column order
+        "sha256": sha256,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def _write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def generate(rows, seed=None, shard_rows=DEFAULT_SHARD_ROWS, workers=None, out_dir=DEFAULT_OUTPUT_DIR, fmt="npy"):
+    """
+    Writes a sharded dataset of `rows` rows and its manifest; returns the
+    manifest. Without a seed, fresh OS entropy is drawn and recorded.
+    """
+    if rows <= 0 or shard_rows <= 0:
+        raise ValueError("rows and shard_rows must be positive")
+    entropy = np.random.SeedSequence(seed).entropy
+    sizes = shard_sizes(rows, shard_rows)
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    if workers == 1:
+        shards = [write_shard(out_dir, i, n, entropy, fmt) for i, n in enumerate(sizes)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(sizes))) as pool:
+            futures = [pool.submit(write_shard, out_dir, i, n, entropy, fmt) for i, n in enumerate(sizes)]
+            shards = [f.result() for f in futures]
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "format": fmt,
+        # Root entropy as a string: it can exceed 64 bits
+        "entropy": str(entropy),
+        "rows": rows,
+        "shard_rows": shard_rows,
+        "workers": workers,
+        "seconds": round(time.perf_counter() - started, 3),
+        "columns": COLUMNS,
+        "vocabularies": VOCABULARIES,
+        "shards": shards,
+        # Over the shard hashes only, so it identifies the data regardless of timings
+        "sha256": hashlib.sha256("".join(s["sha256"] for s in shards).encode()).hexdigest(),
+    }
+    _write_manifest(out_dir, manifest)
+    return manifest
+
+
+def write_columns(out_dir, columns, **metadata):
+    """Writes in-memory columns (e.g. from generate_row()) as a one-shard npy dataset."""
+    os.makedirs(out_dir, exist_ok=True)
+    rows = len(columns[COLUMNS[0]])
+    sha256 = _write_npy_shard(os.path.join(out_dir, shard_name(0)), columns)
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "format": "npy",
+        "rows": rows,
+        "shard_rows": rows,
+        "columns": COLUMNS,
+        "vocabularies": VOCABULARIES,
+        "shards": [{"index": 0, "name": shard_name(0), "rows": rows, "sha256": sha256}],
+        "sha256": hashlib.sha256(sha256.encode()).hexdigest(),
+        **metadata,
+    }
+    _write_manifest(out_dir, manifest)
+    return manifest
+
+
+def read_manifest(out_dir):
+    with open(os.path.join(out_dir, MANIFEST_FILE)) as f:
+        return json.load(f)
+
+
+def read_shard(out_dir, shard, manifest):
+    """
+    Columns of one shard as {column: array}. npy columns are read-only
+    memory maps; csv shards are parsed and dictionary-encoded.
+    """
+    path = os.path.join(out_dir, shard["name"])
+    if manifest["format"] == "csv":
+        # 'None' is a valid string in our dataset (e.g. for Occupation), so disable default NA handling
+        df = pd.read_csv(path, na_values=[], keep_default_na=False)
+        return encode_frame(df, manifest["vocabularies"])
+    return {column: np.load(os.path.join(path, f"{column}.npy"), mmap_mode='r') for column in manifest["columns"]}
+
+
+def read_columns(out_dir):
+    """
+    All rows as ({column: array}, vocabularies). A single-shard npy dataset
+    is returned as memory maps without copying; more shards are concatenated.
+    """
+    manifest = read_manifest(out_dir)
+    shards = [read_shard(out_dir, shard, manifest) for shard in manifest["shards"]]
+    if len(shards) == 1:
+        return shards[0], manifest["vocabularies"]
+    columns = {column: np.concatenate([s[column] for s in shards]) for column in manifest["columns"]}
+    return columns, manifest["vocabularies"]
+
+
+def export_csv(out_dir, path):
+    """Writes the dataset as a single CSV file, one shard at a time."""
+    manifest = read_manifest(out_dir)
+    for i, shard in enumerate(manifest["shards"]):
+        frame = to_frame(read_shard(out_dir, shard, manifest), manifest["vocabularies"])
+        frame.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+    return manifest["rows"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a sharded synthetic dataset")
+    parser.add_argument("--rows", type=int)
+    parser.add_argument("--seed", type=int, help="Root seed; drawn from the OS and recorded when omitted")
+    parser.add_argument("--shard-rows", type=int, default=DEFAULT_SHARD_ROWS)
+    parser.add_argument("--workers", type=int, help="Defaults to the number of CPUs")
+    parser.add_argument("--format", choices=FORMATS, default="npy")
+    parser.add_argument("--out", default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--export-csv", metavar="PATH", help="Export the dataset in --out as one CSV file")
+    args = parser.parse_args()
+
+    if args.export_csv:
+        rows = export_csv(args.out, args.export_csv)
+        print(f"✓ Exported {rows} rows to {args.export_csv}")
+        return
+    if args.rows is None:
+        parser.error("--rows is required to generate a dataset")
+    if args.rows <= 0 or args.shard_rows <= 0:
+        parser.error("--rows and --shard-rows must be positive")
+
+    manifest = generate(args.rows, args.seed, args.shard_rows, args.workers, args.out, args.format)
+    print(f"✓ {manifest['rows']} rows in {len(manifest['shards'])} {args.format} shards "
+          f"({manifest['workers']} workers, {manifest['seconds']}s) written to {os.path.abspath(args.out)}")
+    print(f"  Entropy: {manifest['entropy']}")
+    print(f"  Dataset sha256: {manifest['sha256']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,284 @@
+"""
+Vectorized synthetic training data.
+
+generate_dataset() draws the same distributions as train_model.generate_row(),
+but a column at a time: rows are grouped into one block per scheme, the scheme
+constraints fill their block with array assignments, and the ground-truth risk
+rules are applied as masked array operations. Categorical columns are kept as
+int8 codes into the vocabularies below and returned as pandas categoricals,
+so tens of millions of rows fit in memory.
+
+    df = generate_dataset(1_000_000, seed=42)
+"""
+import numpy as np
+import pandas as pd
+
+# Synthetic Data Config
+# Expanded Scheme List
+SCHEMES = [
+    'Old Age Pension', 'Maternity Benefit', 'Student Scholarship', 'Farmer Support', 'Small Business Loan',
+    'Pradhan Mantri Awas Yojana (Rural)', 'Pradhan Mantri Gramin Awaas Yojana', 'PM-KISAN',
+    'Agri-Clinics and Agri-Business Centres', 'Sukanya Samriddhi Yojana', 'Ujjwala Yojana',
+    'Janani Suraksha Yojana', 'National Health Mission', 'Ayushman Bharat (PM-JAY)',
+    'Post Matric Scholarship for SC Students', 'National Fellowship for OBC Students',
+    'PMGDISHA', 'Skill India Mission', 'Start-up Village Entrepreneurship Programme',
+    'Stand-Up India', 'Pradhan Mantri Mudra Yojana', 'Pradhan Mantri Shram Yogi Maandhan (PM-SYM)',
+    'Van Dhan Yojana', 'Atal Pension Yojana'
+]
+
+STATES = ['Andhra Pradesh', 'Bihar', 'Delhi', 'Karnataka', 'Kerala', 'Maharashtra', 'Rajasthan', 'Tamil Nadu', 'Telangana', 'Uttar Pradesh']
+AREAS = ['Rural', 'Urban']
+GENDERS = ['Male', 'Female', 'Other']
+MARITAL_STATUSES = ['Married', 'Unmarried', 'Widow', 'Divorced']
+SOCIAL_CATEGORIES = ['General', 'OBC', 'SC', 'ST']
+YES_NO = ['Yes', 'No']
+BPL_CATEGORIES = ['APL', 'BPL']
+EMPLOYMENT_STATUSES = ['Employed', 'Government Employed', 'Private Employed', 'Self Employed', 'Unemployed']
+OCCUPATIONS = ['Doctor', 'Engineer', 'Farmer', 'Labourer', 'Private Sector Worker', 'Self Employed', 'Shopkeeper', 'Software Engineer', 'Student', 'Teacher', 'Unemployed']
+
+# Column -> every value it can take (scheme constraints add 'None' and 'Auto Driver' occupations)
+VOCABULARIES = {
+    'scheme_name': SCHEMES,
+    'gender': GENDERS,
+    'marital_status': MARITAL_STATUSES,
+    'state': STATES,
+    'area_of_residence': AREAS,
+    'social_category': SOCIAL_CATEGORIES,
+    'minority_status': YES_NO,
+    'disability_status': YES_NO,
+    'bpl_category': BPL_CATEGORIES,
+    'is_student': YES_NO,
+    'employment_status': EMPLOYMENT_STATUSES,
+    'occupation': OCCUPATIONS + ['None', 'Auto Driver'],
+    'single_parent_child': YES_NO,
+}
+
+# Column order of generate_row()
+COLUMNS = [
+    'user_id', 'scheme_name', 'gender', 'age', 'marital_status', 'state', 'area_of_residence',
+    'social_category', 'minority_status', 'disability_status', 'bpl_category', 'is_student',
+    'employment_status', 'occupation', 'income_annum', 'single_parent_child', 'risk_score',
+]
+
+UNSET = -1
+
+
+def _code(column, value):
+    return VOCABULARIES[column].index(value)
+
+
+def _choice(rng, column, values, size):
+    """Codes of `values` drawn uniformly, like random.choice(values)."""
+    codes = np.array([_code(column, v) for v in values], dtype=np.int8)
+    return codes[rng.integers(len(values), size=size)]
+
+
+def _uniform(rng, low, high, size):
+    """random.randint(low, high) for a whole column (inclusive bounds)."""
+    return rng.integers(low, high + 1, size=size, dtype=np.int32)
+
+
+def _apply_scheme(rng, name, rows, cols):
+    """Scheme-specific constraints for the rows drawn with scheme `name`."""
+    n = len(rows)
+
+    def set_value(column, value):
+        cols[column][rows] = _code(column, value)
+
+    if name == 'Old Age Pension':
+        cols['age'][rows] = _uniform(rng, 60, 90, n)
+        set_value('occupation', 'None')
+        set_value('is_student', 'No')
+        set_value('employment_status', 'Unemployed')
+        set_value('bpl_category', 'BPL')
+
+    elif name in ('Student Scholarship', 'Post Matric Scholarship for SC Students', 'National Fellowship for OBC Students'):
+        cols['age'][rows] = _uniform(rng, 16, 25, n)
+        set_value('occupation', 'Student')
+        set_value('is_student', 'Yes')
+        set_value('employment_status', 'Unemployed')
+        if name == 'Post Matric Scholarship for SC Students':
+            set_value('social_category', 'SC')
+        if name == 'National Fellowship for OBC Students':
+            set_value('social_category', 'OBC')
+            cols['age'][rows] = _uniform(rng, 21, 30, n)
+
+    elif name in ('Maternity Benefit', 'Janani Suraksha Yojana'):
+        cols['age'][rows] = _uniform(rng, 18, 40, n)
+        set_value('gender', 'Female')
+        set_value('marital_status', 'Married')
+        if name == 'Janani Suraksha Yojana':
+            set_value('bpl_category', 'BPL')
+
+    elif name in ('Pradhan Mantri Awas Yojana (Rural)', 'Pradhan Mantri Gramin Awaas Yojana'):
+        set_value('area_of_residence', 'Rural')
+        set_value('bpl_category', 'BPL')
+
+    elif name in ('PM-KISAN', 'Farmer Support'):
+        set_value('occupation', 'Farmer')
+        set_value('employment_status', 'Self Employed')
+        set_value('area_of_residence', 'Rural')
+
+    elif name == 'Agri-Clinics and Agri-Business Centres':
+        cols['age'][rows] = _uniform(rng, 21, 40, n)
+        cols['occupation'][rows] = _choice(rng, 'occupation', ['Student', 'Unemployed'], n)
+
+    elif name == 'Sukanya Samriddhi Yojana':
+        cols['age'][rows] = _uniform(rng, 0, 10, n)
+        set_value('gender', 'Female')
+        set_value('is_student', 'No')
+        set_value('occupation', 'None')
+        set_value('marital_status', 'Unmarried')
+
+    elif name == 'Ujjwala Yojana':
+        set_value('gender', 'Female')
+        set_value('bpl_category', 'BPL')
+        cols['area_of_residence'][rows] = _choice(rng, 'area_of_residence', ['Rural', 'Rural', 'Urban'], n)
+
+    elif name == 'Ayushman Bharat (PM-JAY)':
+        set_value('bpl_category', 'BPL')
+
+    elif name == 'PMGDISHA':
+        set_value('area_of_residence', 'Rural')
+
+    elif name == 'Skill India Mission':
+        cols['age'][rows] = _uniform(rng, 18, 35, n)
+        cols['occupation'][rows] = _choice(rng, 'occupation', ['Unemployed', 'Student'], n)
+
+    elif name == 'Start-up Village Entrepreneurship Programme':
+        set_value('area_of_residence', 'Rural')
+        set_value('employment_status', 'Self Employed')
+
+    elif name == 'Stand-Up India':
+        # SC/ST or Women
+        sc_st = rng.random(n) > 0.5
+        cols['social_category'][rows[sc_st]] = _choice(rng, 'social_category', ['SC', 'ST'], int(sc_st.sum()))
+        cols['gender'][rows[~sc_st]] = _code('gender', 'Female')
+        set_value('employment_status', 'Self Employed')
+
+    elif name in ('Pradhan Mantri Mudra Yojana', 'Small Business Loan'):
+        cols['occupation'][rows] = _choice(rng, 'occupation', ['Shopkeeper', 'Auto Driver', 'Self Employed'], n)
+        set_value('employment_status', 'Self Employed')
+
+    elif name in ('Pradhan Mantri Shram Yogi Maandhan (PM-SYM)', 'Atal Pension Yojana'):
+        cols['occupation'][rows] = _choice(rng, 'occupation', ['Labourer', 'Auto Driver', 'Farmer', 'Shopkeeper'], n)
+        cols['age'][rows] = _uniform(rng, 18, 40, n)
+
+    elif name == 'Van Dhan Yojana':
+        set_value('social_category', 'ST')
+        set_value('area_of_residence', 'Rural')
+
+
+def _fill_unset(rng, column, values, cols):
+    codes = cols[column]
+    unset = codes == UNSET
+    codes[unset] = _choice(rng, column, values, int(unset.sum()))
+
+
+def _scheme_flags(predicate):
+    """Per-scheme boolean lookup for a test on the scheme name."""
+    return np.array([predicate(name) for name in SCHEMES], dtype=bool)
+
+
+def _risk_score(rng, cols):
+    """Ground-truth risk, the rules of generate_row() as masked array operations."""
+    n = len(cols['age'])
+    is_ = lambda column, value: cols[column] == _code(column, value)
+    income = cols['income_annum']
+    score = np.full(n, 0.5)
+
+    # General Risk Factors (Need-based)
+    score += np.where(is_('bpl_category', 'BPL'), 0.15 + rng.uniform(-0.05, 0.05, n), 0.0)
+    score += np.where(income < 60000, 0.15 + rng.uniform(-0.04, 0.04, n),
+                      np.where(income < 120000, 0.08 + rng.uniform(-0.02, 0.02, n), 0.0))
+    score += np.where(is_('disability_status', 'Yes'), 0.15 + rng.uniform(-0.02, 0.02, n), 0.0)
+    score += np.where(is_('social_category', 'SC') | is_('social_category', 'ST'), 0.1 + rng.uniform(-0.02, 0.02, n), 0.0)
+    score += np.where(is_('minority_status', 'Yes'), 0.05, 0.0)
+    score += np.where(is_('single_parent_child', 'Yes'), 0.1, 0.0)
+    score += np.where(is_('marital_status', 'Widow'), 0.1, 0.0)
+
+    # Disqualification, in the same order as generate_row() (the Rural penalty is not a reset)
+    scheme = cols['scheme_name']
+    flag = lambda predicate: _scheme_flags(predicate)[scheme]
+    age = cols['age']
+    not_female = ~is_('gender', 'Female')
+    score[flag(lambda s: 'Old Age' in s) & (age < 60)] = 0
+    score[flag(lambda s: 'Student' in s) & is_('is_student', 'No')] = 0
+    score[flag(lambda s: 'Maternity' in s or 'Janani' in s) & (not_female | (age < 16))] = 0
+    score[flag(lambda s: 'Sukanya' in s) & (not_female | (age > 10))] = 0
+    score -= np.where(flag(lambda s: 'Rural' in s) & is_('area_of_residence', 'Urban'), 0.3, 0.0)
+    score[flag(lambda s: 'SC' in s) & ~is_('social_category', 'SC')] = 0
+    score[flag(lambda s: 'ST' in s) & ~is_('social_category', 'ST')] = 0
+    score[flag(lambda s: 'OBC' in s) & ~is_('social_category', 'OBC')] = 0
+    score[flag(lambda s: 'Woman' in s or 'Women' in s) & not_female] = 0
+
+    # Noise only where the row was not disqualified
+    noise = rng.normal(0, 0.08, n)
+    score = np.where(score > 0.1, score + noise, score)
+    return np.clip(score, 0.0, 1.0)
+
+
+def generate_columns(num_rows, rng):
+    """
+    Generates `num_rows` rows as a dict of NumPy columns; categorical columns
+    are int8 codes into VOCABULARIES.
+    """
+    n = num_rows
+    cols = {column: np.full(n, UNSET, dtype=np.int8) for column in VOCABULARIES}
+    cols['scheme_name'] = rng.integers(len(SCHEMES), size=n).astype(np.int8)
+    cols['is_student'][:] = _code('is_student', 'No')
+    cols['age'] = _uniform(rng, 18, 60, n)
+
+    # One block of rows per scheme
+    order = np.argsort(cols['scheme_name'], kind='stable')
+    bounds = np.cumsum(np.bincount(cols['scheme_name'], minlength=len(SCHEMES)))[:-1]
+    for name, rows in zip(SCHEMES, np.split(order, bounds)):
+        if len(rows):
+            _apply_scheme(rng, name, rows, cols)
+
+    # Fill variables if not set
+    _fill_unset(rng, 'gender', GENDERS, cols)
+    marital = cols['marital_status']
+    minors = (marital == UNSET) & (cols['age'] < 18)
+    marital[minors] = _code('marital_status', 'Unmarried')
+    _fill_unset(rng, 'marital_status', MARITAL_STATUSES, cols)
+
+    # Student/Occupation consistency
+    occupation = cols['occupation']
+    occupation[cols['is_student'] == _code('is_student', 'Yes')] = _code('occupation', 'Student')
+    drawn = occupation == UNSET
+    occupation[drawn] = _choice(rng, 'occupation', OCCUPATIONS, int(drawn.sum()))
+    drawn_students = drawn & (occupation == _code('occupation', 'Student'))
+    cols['is_student'][drawn_students] = _code('is_student', 'Yes')
+    cols['age'][drawn_students] = np.minimum(cols['age'][drawn_students], 30)
+
+    _fill_unset(rng, 'employment_status', EMPLOYMENT_STATUSES, cols)
+    _fill_unset(rng, 'area_of_residence', AREAS, cols)
+    _fill_unset(rng, 'social_category', SOCIAL_CATEGORIES, cols)
+    _fill_unset(rng, 'bpl_category', BPL_CATEGORIES, cols)
+
+    # BPL usually < 1.5L or 1L depending on state, keeping simplistic
+    bpl = cols['bpl_category'] == _code('bpl_category', 'BPL')
+    cols['income_annum'] = np.where(bpl, _uniform(rng, 10000, 150000, n), _uniform(rng, 150000, 2000000, n))
+
+    cols['user_id'] = _uniform(rng, 10000, 99999, n)
+    cols['state'] = _choice(rng, 'state', STATES, n)
+    for column in ('minority_status', 'disability_status', 'single_parent_child'):
+        cols[column] = _choice(rng, column, YES_NO, n)
+
+    cols['risk_score'] = _risk_score(rng, cols)
+    return cols
+
+
+def generate_dataset(num_rows, seed=None):
+    """
+    DataFrame with the columns of generate_row(); categorical columns use the
+    pandas category dtype over VOCABULARIES. `seed` may be an int, a
+    SeedSequence or a np.random.Generator.
+    """
+    cols = generate_columns(num_rows, np.random.default_rng(seed))
+    return pd.DataFrame({
+        column: pd.Categorical.from_codes(cols[column], VOCABULARIES[column])
+        if column in VOCABULARIES else cols[column]
+        for column in COLUMNS
+    })
@@ -1,42 +1,47 @@
 import pandas as pd
 import numpy as np
 import xgboost as xgb
-import pickle
+import argparse
 import os
 import random
+import sys
+import tempfile
+import time
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
 from sklearn.metrics import mean_squared_error
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.model_artifacts import ARTIFACTS_DIR, write_artifacts
+
 # Constants
 NUM_SAMPLES = 15000 # Increased for more schemes
-OUTPUT_MODEL_PATH = os.path.join(os.path.dirname(__file__), '../ml_models/risk_model.pkl')
+OUTPUT_DATASET_DIR = os.path.join(os.path.dirname(__file__), 'synthetic_dataset')
 OUTPUT_DATASET_PATH = os.path.join(os.path.dirname(__file__), 'synthetic_dataset.csv')
 
 # Synthetic Data Config
-# Expanded Scheme List
-SCHEMES = [
-    'Old Age Pension', 'Maternity Benefit', 'Student Scholarship', 'Farmer Support', 'Small Business Loan',
-    'Pradhan Mantri Awas Yojana (Rural)', 'Pradhan Mantri Gramin Awaas Yojana', 'PM-KISAN',
-    'Agri-Clinics and Agri-Business Centres', 'Sukanya Samriddhi Yojana', 'Ujjwala Yojana',
-    'Janani Suraksha Yojana', 'National Health Mission', 'Ayushman Bharat (PM-JAY)',
-    'Post Matric Scholarship for SC Students', 'National Fellowship for OBC Students',
-    'PMGDISHA', 'Skill India Mission', 'Start-up Village Entrepreneurship Programme',
-    'Stand-Up India', 'Pradhan Mantri Mudra Yojana', 'Pradhan Mantri Shram Yogi Maandhan (PM-SYM)',
-    'Van Dhan Yojana', 'Atal Pension Yojana'
-]
-
-STATES = ['Andhra Pradesh', 'Bihar', 'Delhi', 'Karnataka', 'Kerala', 'Maharashtra', 'Rajasthan', 'Tamil Nadu', 'Telangana', 'Uttar Pradesh']
-AREAS = ['Rural', 'Urban']
-GENDERS = ['Male', 'Female', 'Other']
-MARITAL_STATUSES = ['Married', 'Unmarried', 'Widow', 'Divorced']
-SOCIAL_CATEGORIES = ['General', 'OBC', 'SC', 'ST']
-YES_NO = ['Yes', 'No']
-BPL_CATEGORIES = ['APL', 'BPL']
-EMPLOYMENT_STATUSES = ['Employed', 'Government Employed', 'Private Employed', 'Self Employed', 'Unemployed']
-OCCUPATIONS = ['Doctor', 'Engineer', 'Farmer', 'Labourer', 'Private Sector Worker', 'Self Employed', 'Shopkeeper', 'Software Engineer', 'Student', 'Teacher', 'Unemployed']
+from synthetic_data import (
+    AREAS, BPL_CATEGORIES, EMPLOYMENT_STATUSES, GENDERS, MARITAL_STATUSES, OCCUPATIONS, SCHEMES,
+    SOCIAL_CATEGORIES, STATES, YES_NO, COLUMNS,
+)
+from sharded_dataset import encode_frame, export_csv, generate, read_columns, read_manifest, read_shard, write_columns
+
+# Model inputs, in dataset column order
+FEATURES = [c for c in COLUMNS if c not in ('user_id', 'risk_score')]
+
+# Tweak params: Limit depth further but allow learning
+XGB_PARAMS = {
+    'objective': 'reg:squarederror',
+    'learning_rate': 0.06,
+    'max_depth': 4,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'tree_method': 'hist',
+}
+NUM_ROUNDS = 100
 
 def generate_row():
+    """One synthetic row; the reference for synthetic_data.generate_dataset()."""
     # Defaults
     occupation = None
     employment_status = None
@@ -242,29 +247,46 @@ def generate_row():
     
     return row
 
-def main():
-    print(f"Generating {NUM_SAMPLES} synthetic rows with higher noise (Target R2 ~0.77)...")
-    data = [generate_row() for _ in range(NUM_SAMPLES)]
-    df = pd.DataFrame(data)
-    
-    # Save dataset
-    df.to_csv(OUTPUT_DATASET_PATH, index=False)
-    print(f"Dataset saved to {OUTPUT_DATASET_PATH}")
-    
-    # Data Preprocessing
-    categorical_cols = ['scheme_name', 'gender', 'marital_status', 'state', 'area_of_residence', 
-                        'social_category', 'minority_status', 'disability_status', 'bpl_category', 
-                        'is_student', 'employment_status', 'occupation', 'single_parent_child']
-    
-    encoders = {}
-    for col in categorical_cols:
-        le = LabelEncoder()
-        df[col] = le.fit_transform(df[col])
-        encoders[col] = le
-
-    # Features and Target
-    X = df.drop(['user_id', 'risk_score'], axis=1) # Drop ID and Target
-    y = df['risk_score']
+def label_remap(labels, counts):
+    """
+    The sorted labels that occur (counts > 0), which is what
+    LabelEncoder.fit_transform produces, and a dataset code -> model code table.
+    """
+    present = np.flatnonzero(counts)
+    classes = sorted(labels[i] for i in present)
+    remap = np.full(len(labels), -1, dtype=np.int32)
+    remap[present] = [classes.index(labels[i]) for i in present]
+    return classes, remap
+
+def encode_features(columns, vocabularies, categorical="ordinal"):
+    """
+    Feature DataFrame and the model vocabularies. "ordinal" recodes every
+    categorical by label_remap(); "native" keeps the dataset's dictionary
+    codes as pandas categories, so the dataset vocabulary is the model's.
+    Works on the dictionary codes, not the strings.
+    """
+    features, classes = {}, {}
+    for col in FEATURES:
+        values = columns[col]
+        if col not in vocabularies:
+            features[col] = np.asarray(values)
+        elif categorical == "native":
+            classes[col] = list(vocabularies[col])
+            features[col] = pd.Categorical.from_codes(values, classes[col])
+        else:
+            counts = np.bincount(values, minlength=len(vocabularies[col]))
+            classes[col], remap = label_remap(vocabularies[col], counts)
+            features[col] = remap[values]
+    return pd.DataFrame(features), classes
+
+def train_in_memory(dataset_dir, categorical="ordinal"):
+    """Loads the whole dataset and fits XGBRegressor; returns (booster, vocabularies, feature_names, mse)."""
+    print(f"Loading dataset from {dataset_dir}...")
+    columns, dataset_vocabularies = read_columns(dataset_dir)
+
+    # Data Preprocessing: codes as the saved vocabularies list them
+    X, vocabularies = encode_features(columns, dataset_vocabularies, categorical)
+    y = np.asarray(columns['risk_score'])
     
     # Retain feature names
     feature_names = list(X.columns)
@@ -274,33 +296,173 @@ def main():
     
     # XGBoost Model
     print("Training XGBoost model...")
-    # Tweak params: Limit depth further but allow learning
-    model = xgb.XGBRegressor(
-        objective='reg:squarederror', 
-        n_estimators=100, 
-        learning_rate=0.06, 
-        max_depth=4, 
-        subsample=0.8, 
-        colsample_bytree=0.8
-    )
+    model = xgb.XGBRegressor(n_estimators=NUM_ROUNDS, enable_categorical=categorical == "native", **XGB_PARAMS)
     model.fit(X_train, y_train)
     
     # Evaluate
     preds = model.predict(X_test)
     mse = mean_squared_error(y_test, preds)
+    return model.get_booster(), vocabularies, feature_names, mse
+
+# --- Out-of-core training ---
+
+
+# Rows held out per shard; streaming cannot shuffle the whole dataset like train_test_split
+TEST_SIZE = 0.2
+HOLDOUT_SEED = 42
+
+def holdout_mask(shard):
+    """Test rows of a shard, fixed by the shard index."""
+    return np.random.default_rng([HOLDOUT_SEED, shard['index']]).random(shard['rows']) < TEST_SIZE
+
+def shard_features(dataset_dir, shard, manifest, remaps, test):
+    """Encoded float32 features and labels of a shard's train (or test) rows."""
+    columns = read_shard(dataset_dir, shard, manifest)
+    rows = np.flatnonzero(holdout_mask(shard) == test)
+    X = np.empty((len(rows), len(FEATURES)), dtype=np.float32)
+    for j, col in enumerate(FEATURES):
+        values = columns[col][rows]
+        X[:, j] = remaps[col][values] if col in remaps else values
+    return X, np.asarray(columns['risk_score'][rows], dtype=np.float32)
+
+class ShardIter(xgb.DataIter):
+    """Hands XGBoost one dataset shard at a time, so only one is decoded in memory."""
+    def __init__(self, dataset_dir, remaps, test=False, cache_prefix=None, feature_types=None):
+        self.dataset_dir = dataset_dir
+        self.manifest = read_manifest(dataset_dir)
+        self.remaps = remaps
+        self.test = test
+        self.feature_types = feature_types
+        self._shard = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data):
+        shards = self.manifest['shards']
+        if self._shard == len(shards):
+            return False
+        X, y = shard_features(self.dataset_dir, shards[self._shard], self.manifest, self.remaps, self.test)
+        input_data(data=X, label=y, feature_names=FEATURES, feature_types=self.feature_types)
+        self._shard += 1
+        return True
+
+    def reset(self):
+        self._shard = 0
+
+def dataset_remaps(dataset_dir, categorical="ordinal"):
+    """Model vocabularies and code tables from one counting pass over the shards."""
+    manifest = read_manifest(dataset_dir)
+    vocabularies = manifest['vocabularies']
+    if categorical == "native":
+        # Dictionary codes are used as they are
+        return (
+            {col: list(vocabularies[col]) for col in FEATURES if col in vocabularies},
+            {col: np.arange(len(vocabularies[col]), dtype=np.int32) for col in FEATURES if col in vocabularies},
+        )
+    counts = {col: np.zeros(len(vocabularies[col]), dtype=np.int64) for col in FEATURES if col in vocabularies}
+    for shard in manifest['shards']:
+        columns = read_shard(dataset_dir, shard, manifest)
+        for col in counts:
+            counts[col] += np.bincount(columns[col], minlength=len(counts[col]))
+    classes, remaps = {}, {}
+    for col in counts:
+        classes[col], remaps[col] = label_remap(vocabularies[col], counts[col])
+    return classes, remaps
+
+def train_streaming(dataset_dir, mode="quantile", categorical="ordinal"):
+    """
+    Trains on the dataset shards without loading them together: "quantile"
+    keeps only the quantized QuantileDMatrix in memory, "external" pages it
+    to a disk cache (ExtMemQuantileDMatrix). Returns (booster, vocabularies, mse).
+    """
+    vocabularies, remaps = dataset_remaps(dataset_dir, categorical)
+    native = categorical == "native"
+    feature_types = ["c" if col in remaps else "q" for col in FEATURES] if native else None
+    with tempfile.TemporaryDirectory(prefix="xgb-cache-") as cache_dir:
+        if mode == "external":
+            train_iter = ShardIter(dataset_dir, remaps, cache_prefix=os.path.join(cache_dir, "train"), feature_types=feature_types)
+            dtrain = xgb.ExtMemQuantileDMatrix(train_iter, enable_categorical=native)
+        else:
+            train_iter = ShardIter(dataset_dir, remaps, feature_types=feature_types)
+            dtrain = xgb.QuantileDMatrix(train_iter, enable_categorical=native)
+        print(f"Training XGBoost model on {dtrain.num_row()} streamed rows ({mode})...")
+        booster = xgb.train(XGB_PARAMS, dtrain, num_boost_round=NUM_ROUNDS)
+        # Release the external-memory cache files before the directory is removed
+        del dtrain, train_iter
+
+    # Held-out rows, one shard at a time
+    manifest = read_manifest(dataset_dir)
+    squared_error, count = 0.0, 0
+    for shard in manifest['shards']:
+        X, y = shard_features(dataset_dir, shard, manifest, remaps, test=True)
+        squared_error += float(np.sum((booster.inplace_predict(X) - y).astype(np.float64) ** 2))
+        count += len(y)
+    return booster, vocabularies, squared_error / max(count, 1)
+
+def peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be read."""
+    try:
+        import resource  # Unix only
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        # peak_wset is the Windows peak working set
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def report_resources(started):
+    line = f"Wall time: {time.perf_counter() - started:.1f}s"
+    peak_mb = peak_rss_mb()
+    if peak_mb is not None:
+        line += f", peak RSS: {peak_mb:.0f} MB"
+    print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic data and train the risk model")
+    parser.add_argument("--rows", type=int, default=NUM_SAMPLES)
+    parser.add_argument("--seed", type=int, help="Seed for the vectorized generator")
+    parser.add_argument("--generator", choices=["vectorized", "rows"], default="vectorized",
+                        help="NumPy column generator or the generate_row() reference")
+    parser.add_argument("--dataset", help="Train on a dataset written by sharded_dataset.py instead of generating one")
+    parser.add_argument("--csv", action="store_true", help=f"Also export the dataset to {OUTPUT_DATASET_PATH}")
+    parser.add_argument("--stream", choices=["quantile", "external"],
+                        help="Stream the dataset shards into XGBoost instead of loading them (out-of-core)")
+    parser.add_argument("--categorical", choices=["ordinal", "native"], default="ordinal",
+                        help="Label-encoded ordinal codes, or XGBoost native categorical splits over the dataset vocabulary")
+    args = parser.parse_args()
+    started = time.perf_counter()
+
+    dataset_dir = args.dataset or OUTPUT_DATASET_DIR
+    if not args.dataset:
+        print(f"Generating {args.rows} synthetic rows with higher noise (Target R2 ~0.77)...")
+        if args.generator == "rows":
+            df = pd.DataFrame([generate_row() for _ in range(args.rows)])
+            write_columns(dataset_dir, encode_frame(df), generator="generate_row")
+        else:
+            generate(args.rows, seed=args.seed, out_dir=dataset_dir)
+        print(f"Dataset saved to {dataset_dir}")
+    if args.csv:
+        export_csv(dataset_dir, OUTPUT_DATASET_PATH)
+        print(f"Dataset exported to {OUTPUT_DATASET_PATH}")
+
+    if args.stream:
+        booster, vocabularies, mse = train_streaming(dataset_dir, args.stream, args.categorical)
+        feature_names = FEATURES
+    else:
+        booster, vocabularies, feature_names, mse = train_in_memory(dataset_dir, args.categorical)
     print(f"Model MSE: {mse}")
     
-    # Save Model and Encoders
-    artifacts = {
-        'model': model,
-        'encoders': encoders,
-        'feature_names': feature_names,
-        'schemes_list': SCHEMES
-    }
-    
-    with open(OUTPUT_MODEL_PATH, 'wb') as f:
-        pickle.dump(artifacts, f)
-    print(f"Model saved to {OUTPUT_MODEL_PATH}")
+    # Save the booster and encoder vocabularies as a new artifact version
+    version = write_artifacts(
+        booster, vocabularies, feature_names,
+        metadata={'schemes_list': SCHEMES, 'mse': float(mse), 'categorical_encoding': args.categorical},
+    )
+    print(f"Model version {version} saved to {os.path.abspath(ARTIFACTS_DIR)}")
+    report_resources(started)
 
 if __name__ == "__main__":
     main()
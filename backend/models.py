@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Text, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -62,6 +62,9 @@ class CitizenProfile(Base):
     
     digital_dna_vector = Column(Text) # JSON string of vector representation
 
+    # Hash of matcher inputs + catalog/model versions, used to skip unchanged re-saves
+    match_fingerprint = Column(String(64), nullable=True)
+
     user = relationship("User", back_populates="profile")
 
 
@@ -83,6 +86,12 @@ class Scheme(Base):
     apply_url = Column(String(500), nullable=True)
     category = Column(String(255), nullable=True)
 
+    # Support the SQL prefilter on the hard eligibility limits
+    __table_args__ = (
+        Index("ix_schemes_age_window", "min_age", "max_age"),
+        Index("ix_schemes_max_income", "max_income"),
+    )
+
 
 class Recommendation(Base):
     __tablename__ = "recommendations"
@@ -0,0 +1,20 @@
+import sys
+from database import SessionLocal
+from models import User
+
+# Grants the admin role to an existing account. Admins cannot self-register,
+# so this is the only way to create one:
+#   python promote_admin.py user@example.com
+if len(sys.argv) != 2:
+    sys.exit("Usage: python promote_admin.py <email>")
+
+db = SessionLocal()
+user = db.query(User).filter(User.email == sys.argv[1]).first()
+if user is None:
+    db.close()
+    sys.exit(f"✗ No user with email {sys.argv[1]}")
+
+user.role = "admin"
+db.commit()
+db.close()
+print(f"✓ {sys.argv[1]} is now an admin")
@@ -0,0 +1,65 @@
+import io
+import os
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+import database, models, auth
+from services.ai_engine import ai_engine
+from services.bulk_onboarding import detect_format, iter_records, onboard_profiles
+from services.model_artifacts import MANIFEST_FILE, current_version, version_dir
+from services.scheme_catalog import scheme_catalog
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"]
+)
+
+@router.post("/profiles/bulk")
+def bulk_onboard_profiles(
+    file: UploadFile = File(...),
+    format: Optional[str] = None,
+    chunk_size: int = 1000,
+    current_user: models.User = Depends(auth.get_current_admin),
+    db: Session = Depends(database.get_db)
+):
+    # NDJSON or CSV upload, streamed row by row from the spooled upload file
+    fmt = format or detect_format(file.filename)
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    catalog = scheme_catalog.get(db)
+    return onboard_profiles(db, iter_records(stream, fmt), catalog, chunk_size=chunk_size)
+
+@router.get("/model")
+def read_model_status(current_user: models.User = Depends(auth.get_current_admin)):
+    return ai_engine.status()
+
+def _reload_model(version):
+    try:
+        ai_engine.reload(version)
+    except Exception:
+        # Recorded in ai_engine.last_reload and the reload metrics
+        pass
+
+@router.post("/model/reload", status_code=202)
+def reload_model(
+    background_tasks: BackgroundTasks,
+    version: Optional[str] = None,
+    current_user: models.User = Depends(auth.get_current_admin)
+):
+    # Loading and canary validation run after the response; poll GET /admin/model
+    target = version or current_version(ai_engine.artifacts_dir)
+    try:
+        found = os.path.exists(os.path.join(version_dir(target, ai_engine.artifacts_dir), MANIFEST_FILE))
+    except ValueError:
+        found = False
+    if not found:
+        raise HTTPException(status_code=404, detail=f"Model version not found: {target}")
+    background_tasks.add_task(_reload_model, target)
+    return {"status": "reloading", "version": target, "serving": ai_engine.loaded_version()}
+
+@router.post("/model/rollback")
+def rollback_model(current_user: models.User = Depends(auth.get_current_admin)):
+    try:
+        version = ai_engine.rollback()
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "rolled back", "version": version}
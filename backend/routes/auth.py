@@ -19,7 +19,7 @@ def register(user: schemas.UserCreate, db: Session = Depends(database.get_db)):
         email=user.email,
         hashed_password=hashed_password,
         full_name=user.full_name,
-        role=user.role,
+        role="citizen",
         phone=user.phone
     )
     db.add(new_user)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 import database, models, schemas, auth
+from services.batch_matcher import rescore_scheme
+from services.eligibility_rules import parse_rules, validate_rules
+from services.scheme_catalog import scheme_catalog
 
 router = APIRouter(
     prefix="/schemes",
@@ -10,21 +13,36 @@ router = APIRouter(
 
 @router.get("/", response_model=List[schemas.Scheme])
 def read_schemes(skip: int = 0, limit: int = 100, db: Session = Depends(database.get_db)):
-    schemes = db.query(models.Scheme).offset(skip).limit(limit).all()
-    return schemes
+    catalog = scheme_catalog.get(db)
+    return catalog.schemes[skip:skip + limit]
 
 @router.post("/", response_model=schemas.Scheme)
 def create_scheme(
     scheme: schemas.SchemeCreate,
+    background_tasks: BackgroundTasks,
     current_user: models.User = Depends(auth.get_current_user),
     db: Session = Depends(database.get_db)
 ):
     # Ideally check if user is admin
     # if current_user.role != "admin": raise HTTPException...
+    rules = parse_rules(scheme.eligibility_rules)
+    if rules is not None:
+        try:
+            validate_rules(rules)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid eligibility rules: {e}")
+
     db_scheme = models.Scheme(**scheme.dict())
     db.add(db_scheme)
     db.commit()
+    scheme_catalog.invalidate()
     db.refresh(db_scheme)
+    # Recommend the new scheme to existing citizens without blocking the response
+    background_tasks.add_task(rescore_scheme, db_scheme.id)
     return db_scheme
 
+@router.get("/catalog/stats")
+def catalog_stats():
+    return scheme_catalog.stats()
+
 
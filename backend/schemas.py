@@ -9,7 +9,7 @@ class UserCreate(UserBase):
     full_name: str
     password: str
     phone: Optional[str] = None
-    role: str = "citizen" # citizen, admin
+    # No role: self-registered accounts are always citizens (see promote_admin.py)
 
 class UserLogin(UserBase):
     password: str
@@ -1,6 +1,8 @@
+import json
 import database
 import models
 from sqlalchemy.orm import Session
+from services.eligibility_rules import translate_text_rules
 
 # Initialize DB Session
 models.Base.metadata.create_all(bind=database.engine)
@@ -341,6 +343,8 @@ def seed_schemes():
     db.query(models.Scheme).delete()
     for item in schemes_data:
         scheme = models.Scheme(**item)
+        # Store the eligibility text as structured rules
+        scheme.eligibility_rules = json.dumps(translate_text_rules(scheme))
         db.add(scheme)
     
     db.commit()
@@ -1,160 +1,443 @@
-import pickle
 import os
+import threading
+import time
+
 import numpy as np
-import pandas as pd
-import xgboost as xgb
 
-MODEL_PATH = os.path.join(os.path.dirname(__file__), '../ml_models/risk_model.pkl')
+from services import metrics
+from services.inference_batcher import MicroBatcher
+from services.lru_cache import LRUCache
+from services.model_artifacts import ARTIFACTS_DIR, current_version, load_state, set_current_version
+from services.risk_rules import financial_risk_array, health_risk_array
+
+# "inplace" feeds a float32 array straight to the booster; "dataframe" is the
+# original pandas path, kept for parity checks; "trees" evaluates the exported
+# tree arrays with NumPy and does not import xgboost
+INFERENCE_MODE = os.getenv("AI_INFERENCE_MODE", "inplace")
+
+# Entries per score cache (predictions, health risk, financial risk). 0 disables.
+SCORE_CACHE_SIZE = int(os.getenv("AI_SCORE_CACHE_SIZE", "10000"))
+
+# A reloaded model is rejected if its mean canary score moves further than this
+CANARY_MAX_DRIFT = float(os.getenv("AI_CANARY_MAX_DRIFT", "0.25"))
+
+# Seconds between checks of ml_models/risk_model/CURRENT. 0 disables watching.
+MODEL_WATCH_INTERVAL = float(os.getenv("AI_MODEL_WATCH_INTERVAL", "0"))
+
+# Fixed profiles every new model version must score sensibly before it serves
+CANARY_PROFILES = [
+    {'age': 72, 'income': 40000, 'occupation': 'Unemployed', 'gender': 'Male', 'community': 'SC', 'disability_status': True, 'area_of_residence': 'Rural'},
+    {'age': 8, 'income': 90000, 'occupation': 'Student', 'gender': 'Female', 'community': 'General'},
+    {'age': 21, 'income': 120000, 'occupation': 'Student', 'gender': 'Male', 'community': 'OBC', 'is_student': 'Yes'},
+    {'age': 34, 'income': 60000, 'occupation': 'Farmer', 'gender': 'Male', 'community': 'ST', 'area_of_residence': 'Rural'},
+    {'age': 29, 'income': 250000, 'occupation': 'Shopkeeper', 'gender': 'Female', 'community': 'General', 'marital_status': 'Married'},
+    {'age': 45, 'income': 900000, 'occupation': 'Software Engineer', 'gender': 'Male', 'community': 'General', 'employment_status': 'Private Employed'},
+    {'age': 38, 'income': 70000, 'occupation': 'Labourer', 'gender': 'Other', 'community': 'SC', 'single_parent_child': 'Yes'},
+    {'age': 52, 'income': 180000, 'occupation': 'Teacher', 'gender': 'Female', 'community': 'OBC', 'location_state': 'Kerala'},
+]
+
+DEFAULT_FEATURES = [
+   'scheme_name', 'gender', 'age', 'marital_status', 'state', 'area_of_residence', 
+   'social_category', 'minority_status', 'disability_status', 'bpl_category', 
+   'is_student', 'employment_status', 'occupation', 'income_annum', 'single_parent_child'
+]
 
 class AIEngine:
-    def __init__(self):
-        self.model = None
-        self.encoders = {}
-        self.feature_names = []
-        self.load_model()
+    def __init__(self, inference_mode=INFERENCE_MODE, cache_size=SCORE_CACHE_SIZE, artifacts_dir=ARTIFACTS_DIR):
+        self.inference_mode = inference_mode
+        self.artifacts_dir = artifacts_dir
+        # services.model_artifacts.ModelState, loaded on first use or by warm_up()
+        self.state = None
+        # Kept for a one-step rollback after a reload
+        self.previous_state = None
+        self.last_reload = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        # Many citizens share the same risk-relevant attributes
+        self.caches = {
+            "predict_risk": LRUCache(cache_size),
+            "health_risk": LRUCache(cache_size),
+            "financial_risk": LRUCache(cache_size),
+        }
+
+    def warm_up(self):
+        """Loads the model now instead of on the first prediction."""
+        return self._get_state()
+
+    def _get_state(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self.load_model()
+        return self.state
 
     def load_model(self):
         try:
-            if os.path.exists(MODEL_PATH):
-                with open(MODEL_PATH, 'rb') as f:
-                    artifacts = pickle.load(f)
-                    self.model = artifacts['model']
-                    self.encoders = artifacts['encoders']
-                    self.feature_names = artifacts.get('feature_names', [])
-                print("AI Model loaded successfully.")
-            else:
-                print(f"Warning: AI Model not found at {MODEL_PATH}. Using fallback mock logic.")
+            self._swap(load_state(mode=self.inference_mode, base_dir=self.artifacts_dir))
+            print(f"AI Model {self.state.version} loaded successfully.")
+        except FileNotFoundError:
+            print(f"Warning: AI Model not found in {self.artifacts_dir}. Using fallback mock logic.")
         except Exception as e:
             print(f"Error loading AI model: {e}")
+        self._loaded = True
+
+    def _swap(self, new_state):
+        """
+        Makes new_state the serving model with a single reference assignment.
+        Requests that already read the old state finish on it.
+        """
+        old_state = self.state
+        self.state = new_state
+        self.previous_state = old_state
+        self._loaded = True
+        # Cached scores belong to the previous model
+        self.clear_caches()
+        if old_state is not None:
+            metrics.set_gauge("ai_model_info", 0, version=old_state.version)
+        metrics.set_gauge("ai_model_info", 1, version=new_state.version)
+
+    def reload(self, version=None, activate=True):
+        """
+        Loads `version` (default: the CURRENT version on disk) next to the
+        serving model, validates it on the canary batch and swaps it in.
+        With activate, CURRENT is updated so other workers' watchers follow.
+        Raises on load or validation errors; the serving model is untouched.
+        """
+        # Finish the lazy first load, so there is a baseline to compare with
+        self._get_state()
+        with self._reload_lock:
+            target = version or current_version(self.artifacts_dir)
+            if target is not None and target == self.loaded_version():
+                # Already serving: swapping would make previous_state this same version
+                if activate:
+                    set_current_version(target, self.artifacts_dir)
+                self.last_reload = {"version": target, "result": "unchanged", "error": None, "at": time.time()}
+                return target
+            started = time.perf_counter()
+            try:
+                new_state = load_state(target, mode=self.inference_mode, base_dir=self.artifacts_dir)
+                self._validate(new_state)
+                if activate:
+                    set_current_version(new_state.version, self.artifacts_dir)
+            except Exception as e:
+                metrics.inc("ai_model_reloads_total", result="failed")
+                self.last_reload = {"version": target, "result": "failed", "error": str(e), "at": time.time()}
+                print(f"Model reload of {target} rejected: {e}")
+                raise
+            self._swap(new_state)
+            metrics.inc("ai_model_reloads_total", result="success")
+            metrics.observe("ai_model_reload_seconds", time.perf_counter() - started)
+            self.last_reload = {"version": new_state.version, "result": "success", "error": None, "at": time.time()}
+            print(f"AI Model {new_state.version} is now serving.")
+            return new_state.version
+
+    def follow(self, version):
+        """
+        Serves `version` as already validated by another process (e.g. the
+        parent of a scoring pool worker): no canary check, CURRENT untouched.
+        """
+        with self._reload_lock:
+            if version == self.loaded_version():
+                return
+            if self.previous_state is not None and self.previous_state.version == version:
+                self._swap(self.previous_state)
+            else:
+                self._swap(load_state(version, mode=self.inference_mode, base_dir=self.artifacts_dir))
+            print(f"AI Model {version} is now serving (following).")
+
+    def rollback(self):
+        """Swaps the previous model version back in."""
+        with self._reload_lock:
+            if self.previous_state is None:
+                raise ValueError("No previous model version to roll back to")
+            target = self.previous_state
+            set_current_version(target.version, self.artifacts_dir)
+            self._swap(target)
+            metrics.inc("ai_model_reloads_total", result="rollback")
+            self.last_reload = {"version": target.version, "result": "rollback", "error": None, "at": time.time()}
+            return target.version
+
+    def _validate(self, new_state):
+        """Canary check: finite scores, and not too far from the serving model."""
+        matrix = np.array([self._encode(self._build_features(p), new_state) for p in CANARY_PROFILES], dtype=np.float32)
+        scores = np.asarray(self.predict_matrix(matrix, state=new_state), dtype=np.float64)
+        if scores.shape != (len(CANARY_PROFILES),) or not np.isfinite(scores).all():
+            raise ValueError("Canary predictions are missing or not finite")
+
+        current = self.state
+        if current is not None and current.feature_names == new_state.feature_names:
+            baseline = np.asarray(self.predict_matrix(matrix, state=current), dtype=np.float64)
+            drift = float(np.abs(np.clip(scores, 0, 1) - np.clip(baseline, 0, 1)).mean())
+            if drift > CANARY_MAX_DRIFT:
+                raise ValueError(f"Canary drift {drift:.3f} exceeds {CANARY_MAX_DRIFT}")
+
+    def start_watcher(self, interval=MODEL_WATCH_INTERVAL):
+        """Polls CURRENT and reloads when another process switches versions."""
+        if interval <= 0 or self._watcher is not None:
+            return
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), daemon=True, name="model-watcher")
+        self._watcher.start()
+
+    def _watch(self, interval):
+        rejected = None
+        while True:
+            time.sleep(interval)
+            version = current_version(self.artifacts_dir)
+            if not version or version == self.loaded_version() or version == rejected:
+                continue
+            try:
+                self.reload(version, activate=False)
+            except Exception:
+                # Do not retry a bad version until CURRENT changes again
+                rejected = version
+
+    def loaded_version(self):
+        """Serving model version, without triggering a lazy load."""
+        state = self.state
+        return state.version if state else None
+
+    def status(self):
+        previous = self.previous_state
+        return {
+            "version": self.loaded_version(),
+            "previous_version": previous.version if previous else None,
+            "current_on_disk": current_version(self.artifacts_dir),
+            "inference_mode": self.inference_mode,
+            "last_reload": self.last_reload,
+        }
+
+    @property
+    def model_version(self):
+        state = self._get_state()
+        return state.version if state else "fallback"
+
+    def is_ready(self):
+        return self._get_state() is not None
+
+    def clear_caches(self):
+        for cache in self.caches.values():
+            cache.clear()
+
+    def cache_stats(self):
+        return {name: cache.stats() for name, cache in self.caches.items()}
 
     def predict_risk(self, profile_data: dict) -> float:
         """
         Predicts welfare risk score (0.0 to 1.0) using trained XGBoost model.
         """
-        if not self.model:
-            return self._fallback_logic(profile_data)
+        return self.predict_risk_batch([profile_data])[0]
 
-        try:
-            # Map Profile Data to Model Features
-            age = profile_data.get('age', 30)
-            gender = profile_data.get('gender', 'Male')
-            occupation = profile_data.get('occupation', 'Unemployed')
-            income = profile_data.get('income', 50000)
-            
-            # Smart Inference for Context-Dependent Fields
-            # Determine the most applicable scheme context for risk evaluation
-            scheme_name = 'Pradhan Mantri Mudra Yojana' # Default / Business Loan
-            
-            is_student_val = 'No'
-            if 'Student' in occupation or (age < 25 and occupation == 'Unemployed'):
-                is_student_val = 'Yes'
-
-            # Logic Hierarchy
-            if age >= 60:
-                scheme_name = 'Old Age Pension'
-            elif age <= 10 and gender == 'Female':
-                scheme_name = 'Sukanya Samriddhi Yojana'
-            elif 'Farmer' in occupation:
-                scheme_name = 'PM-KISAN'
-            elif is_student_val == 'Yes':
-                if profile_data.get('community') == 'SC':
-                    scheme_name = 'Post Matric Scholarship for SC Students'
-                elif profile_data.get('community') == 'OBC':
-                    scheme_name = 'National Fellowship for OBC Students'
-                else:
-                    scheme_name = 'Student Scholarship'
-            elif gender == 'Female' and 18 <= age <= 40 and profile_data.get('marital_status') == 'Married':
-                 # Pregnancy context usually assumed for these schemes if married/age fit
-                scheme_name = 'Janani Suraksha Yojana' 
-            elif profile_data.get('area_of_residence') == 'Rural' and bpl == 'BPL':
-                scheme_name = 'Pradhan Mantri Awas Yojana (Rural)'
-            elif occupation in ['Labourer']:
-                scheme_name = 'Pradhan Mantri Shram Yogi Maandhan (PM-SYM)'
-            elif occupation in ['Shopkeeper', 'Self Employed']:
-                if gender == 'Female' or profile_data.get('community') in ['SC', 'ST']:
-                    scheme_name = 'Stand-Up India'
-                else:
-                    scheme_name = 'Pradhan Mantri Mudra Yojana'
-            
-            # Derived fields
-            is_student = profile_data.get('is_student', 'No')
-            # Double check inference if explicit flag is somehow wrong but occupation is Student
-            if is_student == 'No' and occupation == 'Student':
-                is_student = 'Yes'
-                
-            marital_status = 'Unmarried' if age < 25 else 'Married' 
-
-            bpl = profile_data.get('bpl_category', 'APL')
-            if income < 150000: bpl = 'BPL'
-            
-            emp_status = profile_data.get('employment_status', 'Unemployed')
-            # Fallback inference if missing
-            if emp_status == 'Unemployed' and occupation != 'Unemployed':
-                if occupation in ['Farmer', 'Shopkeeper', 'Self Employed']: emp_status = 'Self Employed'
-                elif occupation in ['Doctor', 'Engineer', 'Software Engineer', 'Teacher', 'Private Sector Worker']: emp_status = 'Private Employed'
-            
-            raw_input = {
-                'scheme_name': scheme_name,
-                'gender': gender,
-                'age': age,
-                'marital_status': marital_status,
-                'state': profile_data.get('location_state', 'Delhi'),
-                'area_of_residence': profile_data.get('area_of_residence', 'Urban'),
-                'social_category': profile_data.get('community', 'General'),
-                'minority_status': 'No', 
-                'disability_status': 'Yes' if profile_data.get('disability_status') else 'No',
-                'bpl_category': bpl,
-                'is_student': is_student,
-                'employment_status': emp_status,
-                'occupation': occupation,
-                'income_annum': income,
-                'single_parent_child': profile_data.get('single_parent_child', 'No')
-            }
-
-            # Prepare Input Vector
-            input_vector = []
-            features_order = self.feature_names if self.feature_names else [
-               'scheme_name', 'gender', 'age', 'marital_status', 'state', 'area_of_residence', 
-               'social_category', 'minority_status', 'disability_status', 'bpl_category', 
-               'is_student', 'employment_status', 'occupation', 'income_annum', 'single_parent_child'
-            ]
-            
-            for feature in features_order:
-                value = raw_input.get(feature)
-                
-                # Check if this feature needs encoding
-                if feature in self.encoders:
-                    encoder = self.encoders[feature]
-                    # Handle unseen labels by defaulting to the first class
-                    if value not in encoder.classes_:
-                        value = encoder.classes_[0] # Fallback
-                    
-                    encoded_value = encoder.transform([value])[0]
-                    input_vector.append(encoded_value)
-                else:
-                    # Numeric features
-                    input_vector.append(value)
-
-            # Predict
-            input_df = pd.DataFrame([input_vector], columns=features_order)
-            prediction = self.model.predict(input_df)[0]
+    def predict_risk_batch(self, profiles):
+        """
+        Predicts welfare risk scores for many profiles with a single model call.
+        Profiles that cannot be encoded (or all of them, if the model is
+        missing or the prediction fails) get the rule-based fallback score.
+        """
+        state = self._get_state()
+        if state is None:
+            return self._fallback_logic_batch(profiles).tolist()
+
+        cache = self.caches["predict_risk"]
+        scores = [None] * len(profiles)
+        # Encoded row -> positions still needing a prediction
+        pending = {}
+        for i, profile_data in enumerate(profiles):
+            try:
+                key = (state.version, *self._encode(self._build_features(profile_data), state))
+            except Exception as e:
+                print(f"Error in prediction: {e}")
+                scores[i] = self._fallback_logic(profile_data)
+                continue
+            if key in pending:
+                pending[key].append(i)
+                continue
+            cached = cache.get(key)
+            if cached is not None:
+                scores[i] = cached
+            else:
+                pending[key] = [i]
+
+        if pending:
+            keys = list(pending)
+            try:
+                predictions = self.predict_matrix(np.array([key[1:] for key in keys], dtype=np.float32), state=state)
+                for key, prediction in zip(keys, predictions):
+                    score = float(min(max(prediction, 0.0), 1.0))
+                    cache.put(key, score)
+                    for i in pending[key]:
+                        scores[i] = score
+            except Exception as e:
+                print(f"Error in prediction: {e}")
+                for key in keys:
+                    for i in pending[key]:
+                        scores[i] = self._fallback_logic(profiles[i])
+
+        return scores
+
+    def scheme_vocabulary(self):
+        """Scheme name -> code for the schemes the model's encoder knows."""
+        state = self._get_state()
+        if state is None:
+            return {}
+        return state.lookups.get('scheme_name', {})
+
+    def predict_scheme_scores_batch(self, requests):
+        """
+        Scores (profile_data, scheme_names) requests with every scheme as its
+        own scheme context, all in a single model call. Returns one list of
+        scores per request; schemes unknown to the encoder get None.
+        """
+        known = self.scheme_vocabulary()
+        results, rows, slots = [], [], []
+        for profile_data, scheme_names in requests:
+            scores = [None] * len(scheme_names)
+            for j, name in enumerate(scheme_names):
+                if name in known:
+                    rows.append(dict(profile_data, scheme_name=name))
+                    slots.append((scores, j))
+            results.append(scores)
+
+        if rows:
+            for (scores, j), score in zip(slots, self.predict_risk_batch(rows)):
+                scores[j] = score
+        return results
+
+    def predict_matrix(self, matrix, mode=None, state=None):
+        """Raw model output for an encoded (n_rows, n_features) matrix."""
+        state = state or self._get_state()
+        mode = mode or self.inference_mode
+        if mode == "trees":
+            return state.trees.predict(matrix)
+        if mode == "dataframe":
+            import pandas as pd
+            import xgboost as xgb
+            frame = pd.DataFrame(matrix, columns=self._features_order(state))
+            if state.categorical_features:
+                return state.booster.predict(xgb.DMatrix(frame, feature_types=state.feature_types, enable_categorical=True))
+            return state.booster.predict(xgb.DMatrix(frame))
+        return state.booster.inplace_predict(np.ascontiguousarray(matrix, dtype=np.float32))
+
+    def _features_order(self, state):
+        return state.feature_names if state.feature_names else DEFAULT_FEATURES
+
+    def _build_features(self, profile_data):
+        """Maps profile data to the raw (unencoded) model features."""
+        # Map Profile Data to Model Features
+        age = profile_data.get('age', 30)
+        gender = profile_data.get('gender', 'Male')
+        occupation = profile_data.get('occupation', 'Unemployed')
+        income = profile_data.get('income', 50000)
+
+        # Needed by the scheme context below, so derive it first
+        bpl = profile_data.get('bpl_category', 'APL')
+        if income < 150000: bpl = 'BPL'
+        
+        # Smart Inference for Context-Dependent Fields
+        # Determine the most applicable scheme context for risk evaluation
+        scheme_name = 'Pradhan Mantri Mudra Yojana' # Default / Business Loan
+        
+        is_student_val = 'No'
+        if 'Student' in occupation or (age < 25 and occupation == 'Unemployed'):
+            is_student_val = 'Yes'
+
+        # Logic Hierarchy
+        if age >= 60:
+            scheme_name = 'Old Age Pension'
+        elif age <= 10 and gender == 'Female':
+            scheme_name = 'Sukanya Samriddhi Yojana'
+        elif 'Farmer' in occupation:
+            scheme_name = 'PM-KISAN'
+        elif is_student_val == 'Yes':
+            if profile_data.get('community') == 'SC':
+                scheme_name = 'Post Matric Scholarship for SC Students'
+            elif profile_data.get('community') == 'OBC':
+                scheme_name = 'National Fellowship for OBC Students'
+            else:
+                scheme_name = 'Student Scholarship'
+        elif gender == 'Female' and 18 <= age <= 40 and profile_data.get('marital_status') == 'Married':
+             # Pregnancy context usually assumed for these schemes if married/age fit
+            scheme_name = 'Janani Suraksha Yojana' 
+        elif profile_data.get('area_of_residence') == 'Rural' and bpl == 'BPL':
+            scheme_name = 'Pradhan Mantri Awas Yojana (Rural)'
+        elif occupation in ['Labourer']:
+            scheme_name = 'Pradhan Mantri Shram Yogi Maandhan (PM-SYM)'
+        elif occupation in ['Shopkeeper', 'Self Employed']:
+            if gender == 'Female' or profile_data.get('community') in ['SC', 'ST']:
+                scheme_name = 'Stand-Up India'
+            else:
+                scheme_name = 'Pradhan Mantri Mudra Yojana'
+
+        # An explicit scheme context (scheme ranking) overrides the inferred one
+        scheme_name = profile_data.get('scheme_name') or scheme_name
+        
+        # Derived fields
+        is_student = profile_data.get('is_student', 'No')
+        # Double check inference if explicit flag is somehow wrong but occupation is Student
+        if is_student == 'No' and occupation == 'Student':
+            is_student = 'Yes'
             
-            return float(min(max(prediction, 0.0), 1.0))
+        marital_status = 'Unmarried' if age < 25 else 'Married' 
+        
+        emp_status = profile_data.get('employment_status', 'Unemployed')
+        # Fallback inference if missing
+        if emp_status == 'Unemployed' and occupation != 'Unemployed':
+            if occupation in ['Farmer', 'Shopkeeper', 'Self Employed']: emp_status = 'Self Employed'
+            elif occupation in ['Doctor', 'Engineer', 'Software Engineer', 'Teacher', 'Private Sector Worker']: emp_status = 'Private Employed'
+        
+        return {
+            'scheme_name': scheme_name,
+            'gender': gender,
+            'age': age,
+            'marital_status': marital_status,
+            'state': profile_data.get('location_state', 'Delhi'),
+            'area_of_residence': profile_data.get('area_of_residence', 'Urban'),
+            'social_category': profile_data.get('community', 'General'),
+            'minority_status': 'No', 
+            'disability_status': 'Yes' if profile_data.get('disability_status') else 'No',
+            'bpl_category': bpl,
+            'is_student': is_student,
+            'employment_status': emp_status,
+            'occupation': occupation,
+            'income_annum': income,
+            'single_parent_child': profile_data.get('single_parent_child', 'No')
+        }
 
-        except Exception as e:
-            print(f"Error in prediction: {e}")
-            return self._fallback_logic(profile_data)
+    def _encode(self, raw_input, state=None):
+        """Encodes raw features into one model input row, in feature order."""
+        state = state or self._get_state()
+        input_vector = []
+        for feature in self._features_order(state):
+            value = raw_input.get(feature)
+            
+            # Check if this feature needs encoding
+            lookup = state.lookups.get(feature)
+            if lookup is not None:
+                # Unseen labels: the first class, or missing for native categorical features
+                input_vector.append(lookup.get(value, state.unseen_codes[feature]))
+            else:
+                # Numeric features
+                input_vector.append(value)
+        return input_vector
 
     def calculate_financial_risk(self, profile):
         """
         Calculates financial vulnerability score (0-1).
         High score = High financial need.
         """
+        # Rule-based: the key does not involve the model, so no artifact load is triggered
+        key = (
+            profile.get('income', 0),
+            (profile.get('occupation') or "").lower(),
+            (profile.get('employment_status') or "").lower(),
+            profile.get('family_size', 1),
+            profile.get('single_parent_child') == 'Yes',
+        )
+        return self.caches["financial_risk"].get_or_compute(key, lambda: self._financial_risk(*key))
+
+    def _financial_risk(self, income, occ, emp_status, family_size, single_parent_child):
         score = 0.1
-        income = profile.get('income', 0)
-        occ = (profile.get('occupation') or "").lower()
-        emp_status = (profile.get('employment_status') or "").lower()
-        family_size = profile.get('family_size', 1)
         
         # Income factors
         if income <= 0: score += 0.5
@@ -172,7 +455,7 @@ class AIEngine:
              
         # Dependency burden
         if family_size > 4: score += 0.1
-        if profile.get('single_parent_child') == 'Yes': score += 0.15
+        if single_parent_child: score += 0.15
         
         return min(max(score, 0.05), 0.99)
 
@@ -181,10 +464,16 @@ class AIEngine:
         Calculates health vulnerability score (0-1).
         High score = High likelihood of needing health support.
         """
+        key = (
+            profile.get('age', 25),
+            bool(profile.get('disability_status', False)),
+            (profile.get('occupation') or "").lower(),
+            profile.get('income', 100000),
+        )
+        return self.caches["health_risk"].get_or_compute(key, lambda: self._health_risk(*key))
+
+    def _health_risk(self, age, disability, occ, income):
         score = 0.1
-        age = profile.get('age', 25)
-        disability = profile.get('disability_status', False)
-        occ = (profile.get('occupation') or "").lower()
         
         # Age factors
         if age > 70: score += 0.6
@@ -201,15 +490,58 @@ class AIEngine:
             score += 0.2
             
         # Socio-economic link
-        if profile.get('income', 100000) < 100000:
+        if income < 100000:
             score += 0.1 # Poverty correlates with health risks
             
         return min(max(score, 0.05), 0.99)
 
+    def calculate_financial_risk_batch(self, profiles):
+        """Array version of calculate_financial_risk for a list of profiles."""
+        return financial_risk_array(
+            income=[p.get('income', 0) for p in profiles],
+            occupation=[p.get('occupation') for p in profiles],
+            employment_status=[p.get('employment_status') for p in profiles],
+            family_size=[p.get('family_size', 1) for p in profiles],
+            single_parent_child=[p.get('single_parent_child') == 'Yes' for p in profiles],
+        )
+
+    def calculate_health_risk_batch(self, profiles):
+        """Array version of calculate_health_risk for a list of profiles."""
+        return health_risk_array(
+            age=[p.get('age', 25) for p in profiles],
+            disability=[bool(p.get('disability_status', False)) for p in profiles],
+            occupation=[p.get('occupation') for p in profiles],
+            income=[p.get('income', 100000) for p in profiles],
+        )
+
+    def _fallback_logic_batch(self, profiles):
+        return (self.calculate_financial_risk_batch(profiles) + self.calculate_health_risk_batch(profiles)) / 2
+
     def _fallback_logic(self, profile_data):
         # Return average of specific risks
         fin = self.calculate_financial_risk(profile_data)
         hlt = self.calculate_health_risk(profile_data)
         return (fin + hlt) / 2
 
+def profile_to_ai_input(profile):
+    """Builds the risk calculator input from a CitizenProfile-like object."""
+    return {
+        "age": profile.age,
+        "income": profile.income,
+        "family_size": profile.family_size,
+        "disability_status": profile.disability_status,
+        "education": profile.education,
+        "occupation": profile.occupation,
+        "employment_status": profile.employment_status,
+        "is_student": profile.is_student, # Now explicit
+        "location_state": profile.location_state,
+        "area_of_residence": profile.area_of_residence, # Renamed from location_type
+        "community": profile.community,
+        "gender": profile.gender
+    }
+
 ai_engine = AIEngine()
+
+# Coalesces concurrent requests' per-scheme scores, used to rank recommendations,
+# into one model call (AI_MICROBATCH=1)
+scheme_batcher = MicroBatcher(ai_engine.predict_scheme_scores_batch, "scheme_scores")
@@ -0,0 +1,265 @@
+"""
+Reverse matching: one scheme against every citizen profile.
+
+Profiles are read in id-ordered chunks as plain column tuples and turned into
+NumPy columns (ProfileBatch), so a CompiledScheme is evaluated against a whole
+chunk with array operations instead of calling the per-user matcher.
+The rules mirror services.scheme_matcher exactly.
+"""
+import time
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+import database
+import models
+from services import metrics
+from services.eligibility_rules import FARMER_OCCUPATIONS, VENDOR_OCCUPATIONS, enum_value_matches
+from services.scheme_matcher import CompiledScheme, fallback_confidence
+from services.scheme_ranking import scheme_confidences
+
+CHUNK_SIZE = 5000
+
+FALLBACK_REASON = "AI predicted match based on profile"
+
+P = models.CitizenProfile
+PROFILE_COLUMNS = [
+    P.id, P.user_id, P.age, P.income, P.gender, P.occupation, P.is_student,
+    P.community, P.minority_status, P.location_type,
+    P.risk_score_health, P.risk_score_financial,
+    P.disability_status, P.area_of_residence,
+]
+
+
+def _str_array(values, default=""):
+    return np.array([v if v is not None else default for v in values], dtype=str)
+
+
+def _contains(arr, sub):
+    return np.char.find(arr, sub) >= 0
+
+
+class ProfileBatch:
+    """
+    Column-oriented view of a chunk of CitizenProfile rows.
+    """
+    def __init__(self, rows):
+        cols = list(zip(*rows)) if rows else [()] * len(PROFILE_COLUMNS)
+        (ids, user_ids, ages, incomes, genders, occupations, students,
+         communities, minorities, location_types, health, financial,
+         disabilities, areas) = cols
+
+        self.size = len(rows)
+        self.user_id = np.array(user_ids, dtype=object)
+        self.age = np.array([a if a is not None else np.nan for a in ages], dtype=np.float64)
+        self.income = np.array([i if i is not None else np.nan for i in incomes], dtype=np.float64)
+
+        gender = _str_array(genders)
+        self.gender_lower = np.char.lower(gender)
+        self.is_male = self.gender_lower == "male"
+        self.is_female = self.gender_lower == "female"
+
+        occupation = np.char.lower(_str_array(occupations))
+        self.occupation_lower = occupation
+        self.is_farmer = np.logical_or.reduce([_contains(occupation, x) for x in FARMER_OCCUPATIONS])
+        self.is_vendor = np.logical_or.reduce([_contains(occupation, x) for x in VENDOR_OCCUPATIONS])
+        self.occupation_farmer = _contains(occupation, "farmer")
+
+        student = _str_array(students, default="No")
+        self.is_student = student != "No"
+        self.is_student_yes = _str_array(students) == "Yes"
+
+        self.community = _str_array(communities)
+        community = np.char.lower(_str_array(communities, default="General"))
+        self.is_sc = _contains(community, "sc")
+        self.is_st = _contains(community, "st")
+        self.is_obc = _contains(community, "obc")
+        self.is_minority = _str_array(minorities, default="No") == "Yes"
+        self.is_rural = _str_array(location_types) == "Rural"
+        self.has_disability = np.array([bool(d) for d in disabilities], dtype=bool)
+        self.area_lower = np.char.lower(_str_array(areas))
+
+        # Profile values tested by structured enum rules
+        self.enum_values = {
+            "gender": self.gender_lower,
+            "community": self.community,
+            "occupation": self.occupation_lower,
+            "area_of_residence": self.area_lower,
+        }
+
+        h = np.array([x or 0.0 for x in health], dtype=np.float64)
+        f = np.array([x or 0.0 for x in financial], dtype=np.float64)
+        self.score = (h + f) / 2
+
+        # Reason texts, formatted from the raw values like the per-user matcher
+        self.age_text = np.array([f"Eligible for age {a}" for a in ages], dtype=object)
+        self.income_text = np.array([f"Income ₹{i} fits limit" for i in incomes], dtype=object)
+        self.gender_text = np.array([f"Dedicated benefit for {g}" for g in genders], dtype=object)
+        self.community_text = np.array([f"Targeted for {c} category" for c in communities], dtype=object)
+
+
+def excluded_mask(s, b):
+    """Hard filters for one scheme over a ProfileBatch."""
+    excluded = np.zeros(b.size, dtype=bool)
+    if s.female_only or s.women_targeted:
+        excluded |= b.is_male
+    if s.male_only:
+        excluded |= b.is_female
+    if s.min_age:
+        excluded |= b.age < s.min_age
+    if s.max_age:
+        excluded |= b.age > s.max_age
+    if s.max_income:
+        excluded |= b.income > s.max_income
+    if s.farmer_only:
+        excluded |= ~b.is_farmer
+    if s.vendor_only:
+        excluded |= ~b.is_vendor
+    if s.student_only:
+        excluded |= ~b.is_student
+    if s.sc_only:
+        excluded |= ~b.is_sc
+    if s.st_only:
+        excluded |= ~b.is_st
+    if s.obc_only:
+        excluded |= ~b.is_obc
+    if s.minority_only or s.requires_minority:
+        excluded |= ~b.is_minority
+    if s.requires_student:
+        excluded |= ~b.is_student
+    if s.requires_disability:
+        excluded |= ~b.has_disability
+    for key, allowed in s.enums.items():
+        excluded |= _enum_blocked(key, allowed, b.enum_values[key])
+    if s.excluded_genders:
+        excluded |= np.isin(b.gender_lower, list(s.excluded_genders))
+    return excluded
+
+
+def _enum_blocked(key, allowed, values):
+    # Test each distinct profile value once
+    if not len(values):
+        return np.zeros(0, dtype=bool)
+    uniq, inverse = np.unique(values, return_inverse=True)
+    ok = np.array([any(enum_value_matches(key, v, u) for v in allowed) for u in uniq], dtype=bool)
+    return ~ok[inverse]
+
+
+def _community_mask(s, b):
+    # Few distinct communities, so test each unique value once
+    values, inverse = np.unique(b.community, return_inverse=True)
+    hits = np.array([bool(c) and (c in s.scheme_name or c in s.description) for c in values], dtype=bool)
+    return hits[inverse] if b.size else np.zeros(0, dtype=bool)
+
+
+def match_scheme_batch(s, b):
+    """
+    Evaluates one CompiledScheme against a ProfileBatch.
+    Returns (mask, confidence, reason) arrays; confidence and reason are only
+    meaningful where mask is True.
+    """
+    n = b.size
+    none = np.zeros(n, dtype=bool)
+    eligible = ~excluded_mask(s, b)
+
+    # Positive signals, in the order the per-user matcher appends reasons
+    age_ok = (b.age >= s.min_age) if s.min_age else none
+    income_ok = (b.income <= s.max_income) if s.max_income else none
+    gender_ok = (b.gender_lower == s.required_gender) if s.required_gender else none
+    rural_ok = b.is_rural if s.rural_signal else none
+    community_ok = _community_mask(s, b)
+    student_ok = b.is_student_yes if s.student_signal else none
+    farmer_ok = b.occupation_farmer if s.agri_signal else none
+    welfare_ok = (b.score > 0.6) if s.welfare_category else none
+
+    match = gender_ok | rural_ok | community_ok | student_ok | farmer_ok | welfare_ok
+    general_ok = ~match if s.general_category else none
+    match = match | general_ok
+
+    general_text = np.full(n, f"General eligibility for {s.category}", dtype=object)
+    conds = [age_ok, income_ok, gender_ok, rural_ok, community_ok, student_ok, farmer_ok, welfare_ok, general_ok]
+    texts = [
+        b.age_text, b.income_text, b.gender_text,
+        np.full(n, "Rural area support", dtype=object),
+        b.community_text,
+        np.full(n, "Student benefit", dtype=object),
+        np.full(n, "Farmer benefit", dtype=object),
+        np.full(n, "High priority welfare match", dtype=object),
+        general_text,
+    ]
+
+    # First and second reason per profile, picked with a running count of signals
+    seen = np.cumsum(np.stack(conds), axis=0) if n else np.zeros((len(conds), 0))
+    first = np.select([c & (k == 1) for c, k in zip(conds, seen)], texts, default="")
+    second = np.select([c & (k == 2) for c, k in zip(conds, seen)], texts, default="")
+    reason = np.where(second != "", first + " and " + second, first)
+    reason = np.where(reason == "", FALLBACK_REASON, reason)
+
+    confidence = fallback_confidence(b.score)
+    return eligible & match, confidence, reason
+
+
+def iter_profile_batches(db, chunk_size=CHUNK_SIZE):
+    """Yields ProfileBatch chunks using keyset pagination on the profile id."""
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(*PROFILE_COLUMNS)
+            .where(P.id > last_id, P.user_id.isnot(None))
+            .order_by(P.id)
+            .limit(chunk_size)
+        ).all()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield ProfileBatch(rows)
+
+
+def rescore_scheme(scheme_id, chunk_size=CHUNK_SIZE):
+    """
+    Matches one new or changed scheme against every citizen profile and
+    bulk-inserts the resulting recommendations. Intended to run as a
+    background task; opens its own session.
+    """
+    start = time.perf_counter()
+    db = database.SessionLocal()
+    try:
+        scheme = db.query(models.Scheme).filter(models.Scheme.id == scheme_id).first()
+        if not scheme:
+            print(f"Rescore skipped: scheme {scheme_id} not found")
+            return 0
+        rule = CompiledScheme(scheme)
+
+        # Drop stale recommendations for a changed scheme
+        db.execute(delete(models.Recommendation).where(models.Recommendation.scheme_id == scheme_id))
+
+        total = 0
+        for batch in iter_profile_batches(db, chunk_size):
+            mask, confidence, reason = match_scheme_batch(rule, batch)
+            idx = np.flatnonzero(mask)
+            if len(idx):
+                scores = scheme_confidences(db, rule.scheme_name, batch.user_id[idx], confidence[idx].tolist())
+                db.execute(insert(models.Recommendation), [
+                    {
+                        "user_id": batch.user_id[i],
+                        "scheme_id": scheme_id,
+                        "confidence_score": float(score),
+                        "reason": reason[i],
+                    }
+                    for i, score in zip(idx, scores)
+                ])
+            db.commit()
+            total += len(idx)
+            metrics.inc("scheme_rescore_profiles_total", batch.size)
+
+        elapsed = time.perf_counter() - start
+        metrics.inc("scheme_rescore_recommendations_total", total)
+        metrics.observe("scheme_rescore_seconds", elapsed)
+        print(f"Rescored scheme {scheme_id}: {total} recommendations in {elapsed:.2f}s")
+        return total
+    except Exception as e:
+        db.rollback()
+        print(f"Error rescoring scheme {scheme_id}: {e}")
+        raise
+    finally:
+        db.close()
@@ -0,0 +1,226 @@
+"""
+Bulk profile onboarding.
+
+Streams NDJSON or CSV profile records in constant memory, validates each row
+against schemas.ProfileCreate, and processes them in chunks: risk scores and
+scheme matches are computed for the whole chunk (services.risk_rules arrays
+and match_scheme_batch over a ProfileBatch), profiles and recommendations are
+written with bulk statements, and every chunk is committed in its own
+transaction.
+"""
+import csv
+import json
+import time
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select, update
+
+import models
+import schemas
+from services import metrics
+from services.ai_engine import ai_engine, profile_to_ai_input
+from services.batch_matcher import ProfileBatch, match_scheme_batch
+from services.recommendations import profile_fingerprint, sync_recommendations_bulk
+from services.scheme_ranking import rank_matches_batch
+
+CHUNK_SIZE = 1000
+
+# Keep the error report bounded for very dirty files
+MAX_REPORTED_ERRORS = 1000
+
+P = models.CitizenProfile
+
+
+def iter_records(stream, fmt):
+    """
+    Yields (row_number, record) from a text stream.
+    fmt is "ndjson" or "csv"; empty CSV cells are treated as missing.
+    """
+    if fmt == "csv":
+        for row_number, row in enumerate(csv.DictReader(stream), start=1):
+            yield row_number, {k: v for k, v in row.items() if v not in ("", None)}
+    elif fmt == "ndjson":
+        for row_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except json.JSONDecodeError as e:
+                yield row_number, e
+    else:
+        raise ValueError(f"Unsupported format: {fmt}")
+
+
+def detect_format(filename):
+    return "csv" if (filename or "").lower().endswith(".csv") else "ndjson"
+
+
+class OnboardingReport:
+    def __init__(self):
+        self.processed = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.errors = []
+        self.start = time.perf_counter()
+
+    def error(self, row_number, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def as_dict(self):
+        elapsed = time.perf_counter() - self.start
+        return {
+            "processed": self.processed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "errors": self.errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round(self.processed / elapsed, 1) if elapsed > 0 else 0.0,
+        }
+
+
+def _resolve_users(db, chunk, report):
+    """Maps each row to an existing user via `user_id` or `email`."""
+    emails = {r["email"] for _, r, _ in chunk if "email" in r and "user_id" not in r}
+    ids = {_as_int(r["user_id"]) for _, r, _ in chunk if "user_id" in r}
+
+    by_email = dict(db.execute(select(models.User.email, models.User.id).where(models.User.email.in_(emails))).all()) if emails else {}
+    known_ids = set(db.execute(select(models.User.id).where(models.User.id.in_(ids))).scalars()) if ids else set()
+
+    resolved = []
+    for row_number, record, profile in chunk:
+        if "user_id" in record:
+            user_id = _as_int(record["user_id"])
+            if user_id not in known_ids:
+                report.error(row_number, f"Unknown user_id {record['user_id']}")
+                continue
+        elif "email" in record:
+            user_id = by_email.get(record["email"])
+            if user_id is None:
+                report.error(row_number, f"Unknown email {record['email']}")
+                continue
+        else:
+            report.error(row_number, "Row needs a user_id or email")
+            continue
+        resolved.append((row_number, user_id, profile))
+    return resolved
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _process_chunk(db, resolved, catalog):
+    # Later rows for the same user win, like sequential profile saves
+    latest = {}
+    for _, user_id, profile in resolved:
+        latest[user_id] = profile
+
+    existing = {
+        user_id: (profile_id, minority_status, location_type)
+        for profile_id, user_id, minority_status, location_type in db.execute(
+            select(P.id, P.user_id, P.minority_status, P.location_type).where(P.user_id.in_(list(latest)))
+        ).all()
+    }
+
+    user_ids = list(latest)
+    ai_inputs = [profile_to_ai_input(latest[user_id]) for user_id in user_ids]
+    health = ai_engine.calculate_health_risk_batch(ai_inputs).tolist()
+    financial = ai_engine.calculate_financial_risk_batch(ai_inputs).tolist()
+
+    inserts, updates, batch_rows = [], [], []
+    for user_id, h_score, f_score in zip(user_ids, health, financial):
+        profile = latest[user_id]
+        data = profile.dict()
+        fingerprint = profile_fingerprint(data, catalog.version, ai_engine.model_version)
+        data.update(
+            risk_score_health=h_score,
+            risk_score_financial=f_score,
+            match_fingerprint=fingerprint,
+        )
+
+        profile_id, minority_status, location_type = existing.get(user_id, (None, "No", "Urban"))
+        if profile_id:
+            updates.append(dict(data, id=profile_id))
+        else:
+            inserts.append(dict(data, user_id=user_id))
+
+        batch_rows.append((
+            profile_id, user_id, profile.age, profile.income, profile.gender, profile.occupation,
+            profile.is_student, profile.community, minority_status, location_type, h_score, f_score,
+            profile.disability_status, profile.area_of_residence,
+        ))
+
+    if inserts:
+        db.execute(insert(P), inserts)
+    if updates:
+        db.execute(update(P), updates)
+
+    # Scheme matching for the whole chunk, one scheme at a time
+    batch = ProfileBatch(batch_rows)
+    matches_by_user = {user_id: [] for user_id in user_ids}
+    for rule in catalog.compiled.rules:
+        mask, confidence, reason = match_scheme_batch(rule, batch)
+        for i in mask.nonzero()[0]:
+            matches_by_user[user_ids[i]].append((rule.id, float(confidence[i]), reason[i]))
+
+    # Model confidence per (profile, scheme) for the whole chunk in one call
+    ranked = rank_matches_batch(
+        [(latest[user_id], matches_by_user[user_id]) for user_id in user_ids],
+        catalog.compiled.names,
+    )
+    sync_recommendations_bulk(db, dict(zip(user_ids, ranked)))
+
+
+def onboard_profiles(db, records, catalog, chunk_size=CHUNK_SIZE):
+    """
+    Validates and ingests (row_number, record) pairs, committing one
+    transaction per chunk. Returns the report as a dict.
+    """
+    report = OnboardingReport()
+    chunk = []
+
+    def flush():
+        resolved = _resolve_users(db, chunk, report)
+        chunk.clear()
+        if not resolved:
+            return
+        try:
+            _process_chunk(db, resolved, catalog)
+            db.commit()
+            report.succeeded += len(resolved)
+        except Exception as e:
+            db.rollback()
+            for row_number, _, _ in resolved:
+                report.error(row_number, f"Chunk failed: {e}")
+
+    for row_number, record in records:
+        report.processed += 1
+        if isinstance(record, Exception):
+            report.error(row_number, f"Invalid JSON: {record}")
+            continue
+        if not isinstance(record, dict):
+            report.error(row_number, "Row is not an object")
+            continue
+        try:
+            profile = schemas.ProfileCreate(**record)
+        except ValidationError as e:
+            report.error(row_number, "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()))
+            continue
+
+        chunk.append((row_number, record, profile))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+
+    result = report.as_dict()
+    metrics.inc("bulk_onboarding_rows_total", report.succeeded, result="succeeded")
+    metrics.inc("bulk_onboarding_rows_total", report.failed, result="failed")
+    metrics.observe("bulk_onboarding_rows_per_second", result["rows_per_second"], buckets=(100, 500, 1000, 2500, 5000, 10000, 25000))
+    return result
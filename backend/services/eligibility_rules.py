@@ -0,0 +1,167 @@
+"""
+Structured eligibility rules.
+
+Scheme.eligibility_rules may hold a JSON object instead of free text:
+
+    {
+        "text": "SC students only. Annual parental income < Rs 2.5 Lakhs.",
+        "age": {"min": 16, "max": 30},
+        "income": {"max": 250000},
+        "gender": ["Female"],
+        "exclude_gender": ["Male"],
+        "community": ["SC", "ST"],
+        "occupation": ["farmer", "cultivator"],
+        "area_of_residence": ["Rural"],
+        "student": true,
+        "minority": true,
+        "disability": true
+    }
+
+Every key is optional. Ranges tighten the min_age/max_age/max_income columns.
+Enums are any-of lists compared case-insensitively: gender and
+area_of_residence against the whole value, community against the tokens of
+the citizen's community (so "SC/ST" satisfies ["ST"]), and occupation
+keywords as whole words, plurals included, of the citizen's occupation.
+exclude_gender rejects the listed genders and lets every other value
+(including an empty one) through. Boolean flags require the citizen to be a
+student / minority / person with disability.
+
+Free-text rules keep working through the keyword heuristics in
+services.scheme_matcher; translate_text_rules() converts them once
+(see migrate_eligibility_rules.py and seed_schemes.py).
+"""
+import json
+import re
+
+RANGE_KEYS = {"age": ("min", "max"), "income": ("max",)}
+ENUM_KEYS = ["gender", "community", "occupation", "area_of_residence"]
+EXCLUDE_KEYS = ["exclude_gender"]
+FLAG_KEYS = ["student", "minority", "disability"]
+ALLOWED_KEYS = {"text", *RANGE_KEYS, *ENUM_KEYS, *EXCLUDE_KEYS, *FLAG_KEYS}
+
+# Keyword lists shared by the free-text heuristics (services.scheme_matcher)
+# and the one-off text translation
+WOMEN_KEYWORDS = ["women", "woman", "female", "girl", "daughter", "maternity", "widow", "mahila", "nari", "sister", "mother"]
+FARMER_KEYWORDS = ["kisan", "farmer", "agriculture", "krishi", "crop insurance"]
+VENDOR_KEYWORDS = ["street vendor", "svanidhi"]
+STUDENT_KEYWORDS = ["student", "scholarship", "fellowship", "matric", "university", "college"]
+
+FEMALE_GENDERS = ["female", "woman", "women"]
+MALE_GENDERS = ["male", "man", "men"]
+
+# Profile occupations that satisfy farmer / street vendor schemes
+FARMER_OCCUPATIONS = ["farmer", "agriculture", "cultivator"]
+VENDOR_OCCUPATIONS = ["vendor", "hawker"]
+
+
+def parse_rules(raw):
+    """
+    Returns the structured rule dict stored in an eligibility_rules value,
+    or None if the value is free text.
+    """
+    if not raw or not raw.lstrip().startswith("{"):
+        return None
+    try:
+        rules = json.loads(raw)
+    except ValueError:
+        return None
+    return rules if isinstance(rules, dict) else None
+
+
+def validate_rules(rules):
+    """Raises ValueError if a structured rule dict is malformed."""
+    unknown = set(rules) - ALLOWED_KEYS
+    if unknown:
+        raise ValueError(f"Unknown eligibility rule keys: {sorted(unknown)}")
+
+    for key, bounds in RANGE_KEYS.items():
+        if key not in rules:
+            continue
+        if not isinstance(rules[key], dict) or set(rules[key]) - set(bounds):
+            raise ValueError(f"'{key}' must be an object with keys {list(bounds)}")
+        for bound, value in rules[key].items():
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+                raise ValueError(f"'{key}.{bound}' must be a number")
+
+    for key in ENUM_KEYS + EXCLUDE_KEYS:
+        if key in rules and (not isinstance(rules[key], list) or not all(isinstance(v, str) for v in rules[key])):
+            raise ValueError(f"'{key}' must be a list of strings")
+
+    for key in FLAG_KEYS:
+        if key in rules and not isinstance(rules[key], bool):
+            raise ValueError(f"'{key}' must be true or false")
+
+    if "text" in rules and not isinstance(rules["text"], str):
+        raise ValueError("'text' must be a string")
+
+
+def tokens(value):
+    """Lowercase alphanumeric tokens of a profile value."""
+    return set(re.findall(r"[a-z0-9]+", (value or "").lower()))
+
+
+def _has_word(text, *phrases):
+    """True if one of the phrases appears in text as whole words, plural forms included."""
+    return any(re.search(r"\b" + re.escape(p) + r"(?:s|es)?\b", text) for p in phrases)
+
+
+def occupation_matches(keyword, occupation):
+    """True if the keyword appears as a whole word (or phrase) in the occupation, e.g. "Farmers"."""
+    return _has_word((occupation or "").lower(), keyword.lower())
+
+
+def enum_value_matches(key, value, profile_value):
+    """Tests one lowercased rule value against a raw profile value."""
+    if key == "community":
+        return value in tokens(profile_value)
+    if key == "occupation":
+        return occupation_matches(value, profile_value)
+    return value == (profile_value or "").lower()
+
+
+def translate_text_rules(scheme):
+    """
+    One-off translation of a free-text scheme into a structured rule dict.
+    Uses word-boundary matching, so e.g. "disc" no longer reads as "SC";
+    otherwise the result excludes the same profiles as the text heuristics.
+    Returns None if the scheme already has structured rules.
+    """
+    raw = scheme.eligibility_rules
+    if parse_rules(raw) is not None:
+        return None
+
+    name = scheme.scheme_name or ""
+    description = scheme.description or ""
+    text = f"{name} {description} {raw or ''}".lower()
+    rules = {"text": raw or ""}
+
+    required = (scheme.required_gender or "").lower()
+    women_text = f"{scheme.category or ''} {name}".lower()
+    # Like the heuristics, only men are turned away; "Other" and unset genders pass
+    if required in FEMALE_GENDERS or _has_word(women_text, *WOMEN_KEYWORDS):
+        rules["exclude_gender"] = ["Male"]
+    elif required in MALE_GENDERS:
+        rules["exclude_gender"] = ["Female"]
+
+    if _has_word(text, *FARMER_KEYWORDS):
+        rules["occupation"] = FARMER_OCCUPATIONS
+    elif _has_word(text, *VENDOR_KEYWORDS):
+        rules["occupation"] = VENDOR_OCCUPATIONS
+
+    if _has_word(text, *STUDENT_KEYWORDS):
+        rules["student"] = True
+
+    communities = []
+    if _has_word(text, "sc", "scheduled caste"):
+        communities.append("SC")
+    if _has_word(text, "st", "scheduled tribe"):
+        communities.append("ST")
+    if _has_word(text, "obc", "backward class"):
+        communities.append("OBC")
+    if communities:
+        rules["community"] = communities
+
+    if _has_word(text, "minority", "minorities"):
+        rules["minority"] = True
+
+    return rules
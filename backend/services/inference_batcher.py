@@ -0,0 +1,105 @@
+"""
+asyncio micro-batcher for model inference.
+
+Concurrent requests each want a prediction for a few rows. The batcher
+queues them on the event loop, collects items for up to `max_wait_ms` or
+`max_batch_size` items, runs the batch function once in the default thread
+pool and resolves every caller's future with its own result.
+
+Sync route handlers run in the thread pool, so they submit through
+submit_threadsafe(); when the batcher is not running (AI_MICROBATCH=0, CLI
+scripts, tests) that simply calls the batch function directly.
+"""
+import asyncio
+import os
+import time
+
+from services import metrics
+
+ENABLED = os.getenv("AI_MICROBATCH", "0") == "1"
+MAX_BATCH_SIZE = int(os.getenv("AI_MICROBATCH_MAX_SIZE", "64"))
+MAX_WAIT_MS = float(os.getenv("AI_MICROBATCH_MAX_WAIT_MS", "2"))
+
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512)
+
+
+class MicroBatcher:
+    def __init__(self, batch_fn, name, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        """batch_fn maps a list of items to a list of results in the same order."""
+        self.batch_fn = batch_fn
+        self.name = name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._loop = None
+        self._queue = None
+        self._task = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Starts the collector task; call from inside the running event loop."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._task = self._loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item):
+        """Queues one item and waits for its result."""
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def submit_threadsafe(self, item, timeout=None):
+        """Blocking submit for code running outside the event loop."""
+        if not self.running:
+            return self.batch_fn([item])[0]
+        return asyncio.run_coroutine_threadsafe(self.submit(item), self._loop).result(timeout)
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            metrics.observe("inference_batch_size", len(batch), buckets=SIZE_BUCKETS, batcher=self.name)
+            metrics.observe("inference_queue_depth", self._queue.qsize(), buckets=DEPTH_BUCKETS, batcher=self.name)
+
+            items = [item for item, _ in batch]
+            started = time.perf_counter()
+            try:
+                # The model call is CPU-bound, keep it off the event loop
+                results = await self._loop.run_in_executor(None, self.batch_fn, items)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            metrics.observe("inference_batch_seconds", time.perf_counter() - started, batcher=self.name)
+
+            for (_, future), result in zip(batch, results):
+                # The caller may have given up (timeout / disconnect)
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,192 @@
+"""
+Versioned, pickle-free risk model artifacts.
+
+    ml_models/risk_model/
+        CURRENT                 name of the active version
+        <version>/
+            model.ubj           XGBoost booster (UBJSON)
+            trees.npz           the same trees as flat arrays (services.tree_evaluator)
+            vocabularies.json   {feature: [label, ...]}; a label's code is its index
+            manifest.json       version, feature order, native categorical
+                                features, sha256 of every file
+
+The version is a prefix of the booster's sha256, so re-exporting the same
+model is a no-op. Loading verifies the hashes of the files it reads; the
+booster needs xgboost, the tree arrays only NumPy. Nothing here imports
+scikit-learn or pandas.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from services.tree_evaluator import TreeEnsemble
+
+ARTIFACTS_DIR = os.path.join(os.path.dirname(__file__), '../ml_models/risk_model')
+
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+BOOSTER_FILE = "model.ubj"
+TREES_FILE = "trees.npz"
+VOCABULARIES_FILE = "vocabularies.json"
+
+FORMAT_VERSION = 1
+
+# Code of an unseen label for a native categorical feature (missing value)
+NAN = float("nan")
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path, text):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_artifacts(booster, vocabularies, feature_names, base_dir=ARTIFACTS_DIR, activate=True, metadata=None):
+    """
+    Writes a new artifact version from a trained xgboost Booster and the
+    {feature: [labels]} vocabularies. Returns the version name.
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=base_dir)
+    try:
+        booster.feature_names = list(feature_names)
+        booster.save_model(os.path.join(staging, BOOSTER_FILE))
+        TreeEnsemble.from_booster_json(booster.save_raw(raw_format="json")).save(os.path.join(staging, TREES_FILE))
+        with open(os.path.join(staging, VOCABULARIES_FILE), 'w') as f:
+            json.dump(vocabularies, f, indent=1, sort_keys=True)
+
+        files = {name: sha256_file(os.path.join(staging, name)) for name in [BOOSTER_FILE, TREES_FILE, VOCABULARIES_FILE]}
+        version = files[BOOSTER_FILE][:12]
+        manifest = {
+            "format": FORMAT_VERSION,
+            "version": version,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "feature_names": list(feature_names),
+            # Features the booster splits on as categories ("c"), not as ordinal codes
+            "categorical_features": [
+                name for name, kind in zip(feature_names, booster.feature_types or []) if kind == "c"
+            ],
+            "files": files,
+            **(metadata or {}),
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f, indent=1)
+
+        target = os.path.join(base_dir, version)
+        if os.path.exists(target):
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if activate:
+        set_current_version(version, base_dir)
+    return version
+
+
+def current_version(base_dir=ARTIFACTS_DIR):
+    path = os.path.join(base_dir, CURRENT_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return f.read().strip() or None
+
+
+def version_dir(version, base_dir=ARTIFACTS_DIR):
+    """Directory of an artifact version; rejects names that are not plain directory names."""
+    if not version or version != os.path.basename(version) or version.startswith("."):
+        raise ValueError(f"Invalid model version: {version!r}")
+    return os.path.join(base_dir, version)
+
+
+def set_current_version(version, base_dir=ARTIFACTS_DIR):
+    if not os.path.exists(os.path.join(version_dir(version, base_dir), MANIFEST_FILE)):
+        raise ValueError(f"Unknown model version: {version}")
+    _write_atomic(os.path.join(base_dir, CURRENT_FILE), version + "\n")
+
+
+def read_manifest(directory):
+    with open(os.path.join(directory, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported artifact format: {manifest.get('format')}")
+    return manifest
+
+
+def _verified_path(directory, manifest, name):
+    path = os.path.join(directory, name)
+    expected = manifest["files"].get(name)
+    if expected is None or sha256_file(path) != expected:
+        raise ValueError(f"Hash mismatch for {name} in {directory}")
+    return path
+
+
+class ModelState:
+    """
+    One loaded model version: predictor plus the feature order and the
+    {label: code} lookup tables used to encode categorical features.
+    """
+    def __init__(self, version, feature_names, vocabularies, booster=None, trees=None, categorical_features=()):
+        self.version = version
+        self.feature_names = list(feature_names)
+        self.booster = booster
+        self.trees = trees
+        self.categorical_features = list(categorical_features)
+        self.lookups = {
+            feature: {label: code for code, label in enumerate(labels)}
+            for feature, labels in vocabularies.items()
+        }
+        # Unseen labels are encoded as the first class, like the old LabelEncoder fallback;
+        # native categorical features treat them as missing instead
+        self.unseen_codes = {
+            feature: NAN if feature in self.categorical_features else 0
+            for feature in vocabularies
+        }
+
+    @property
+    def feature_types(self):
+        """XGBoost feature types for a DMatrix over encoded rows."""
+        return ["c" if f in self.categorical_features else "q" for f in self.feature_names]
+
+
+def load_state(version=None, mode="inplace", base_dir=ARTIFACTS_DIR):
+    """
+    Loads an artifact version (default: CURRENT) into a ModelState.
+    mode "trees" reads the NumPy tree arrays; anything else loads the booster.
+    """
+    version = version or current_version(base_dir)
+    if version is None:
+        raise FileNotFoundError(f"No model version found in {base_dir}")
+    path = version_dir(version, base_dir)
+    manifest = read_manifest(path)
+
+    with open(_verified_path(path, manifest, VOCABULARIES_FILE)) as f:
+        vocabularies = json.load(f)
+
+    # Older manifests predate native categorical features
+    categorical = manifest.get("categorical_features", [])
+    if mode == "trees":
+        with np.load(_verified_path(path, manifest, TREES_FILE)) as data:
+            trees = TreeEnsemble.from_npz(data)
+        return ModelState(manifest["version"], manifest["feature_names"], vocabularies, trees=trees, categorical_features=categorical)
+
+    import xgboost as xgb
+    booster = xgb.Booster()
+    booster.load_model(_verified_path(path, manifest, BOOSTER_FILE))
+    return ModelState(manifest["version"], manifest["feature_names"], vocabularies, booster=booster, categorical_features=categorical)
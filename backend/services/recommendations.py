@@ -0,0 +1,105 @@
+"""
+Recommendation persistence.
+
+Instead of deleting every recommendation for a user and re-adding all
+matches, the new match set is diffed against the stored rows and only the
+changed rows are inserted, updated or deleted with bulk statements.
+Unchanged re-submissions are detected with a profile fingerprint and skip
+recomputation entirely.
+"""
+import hashlib
+import json
+
+from sqlalchemy import delete, insert, select, update
+
+import models
+from services import metrics
+
+R = models.Recommendation
+
+# Uploaded document filenames do not influence risk scores or matching
+DOCUMENT_FIELDS = [
+    "marriage_cert", "divorce_cert", "widow_cert", "community_cert", "aadhar_card",
+    "income_cert", "disability_cert", "education_cert", "bpl_cert",
+]
+
+# Stored confidence may lose precision (e.g. MySQL FLOAT), so compare with a tolerance
+CONFIDENCE_TOLERANCE = 1e-6
+
+
+def sync_recommendations(db, user_id, matches):
+    """
+    Brings a user's stored recommendations in line with `matches`, a list of
+    (scheme_id, confidence_score, reason) tuples. Does not commit.
+    Returns a dict with the number of inserted, updated and deleted rows.
+    """
+    return sync_recommendations_bulk(db, {user_id: matches})
+
+
+def sync_recommendations_bulk(db, matches_by_user):
+    """
+    Same as sync_recommendations for many users at once, with a single read
+    and at most one bulk statement per operation.
+    """
+    wanted = {
+        (user_id, scheme_id): (confidence, reason)
+        for user_id, matches in matches_by_user.items()
+        for scheme_id, confidence, reason in matches
+    }
+    existing = db.execute(
+        select(R.id, R.user_id, R.scheme_id, R.confidence_score, R.reason)
+        .where(R.user_id.in_(list(matches_by_user)))
+    ).all() if matches_by_user else []
+
+    kept = set()
+    to_delete = []
+    to_update = []
+    for rec_id, user_id, scheme_id, confidence, reason in existing:
+        key = (user_id, scheme_id)
+        # No longer eligible, or a duplicate row for the same scheme
+        if key not in wanted or key in kept:
+            to_delete.append(rec_id)
+            continue
+        kept.add(key)
+
+        new_confidence, new_reason = wanted[key]
+        if confidence is None or abs(confidence - new_confidence) > CONFIDENCE_TOLERANCE or reason != new_reason:
+            to_update.append({"id": rec_id, "confidence_score": new_confidence, "reason": new_reason})
+
+    to_insert = [
+        {"user_id": user_id, "scheme_id": scheme_id, "confidence_score": confidence, "reason": reason}
+        for (user_id, scheme_id), (confidence, reason) in wanted.items()
+        if (user_id, scheme_id) not in kept
+    ]
+
+    if to_delete:
+        db.execute(delete(R).where(R.id.in_(to_delete)))
+    if to_update:
+        db.execute(update(R), to_update)
+    if to_insert:
+        db.execute(insert(R), to_insert)
+
+    counts = {"inserted": len(to_insert), "updated": len(to_update), "deleted": len(to_delete)}
+    for op, count in counts.items():
+        if count:
+            metrics.inc("recommendation_writes_total", count, op=op)
+    metrics.inc("recommendation_rows_unchanged_total", len(kept) - len(to_update))
+    return counts
+
+
+def profile_fingerprint(profile_data, catalog_version, model_version):
+    """
+    Content hash of the matcher-relevant profile fields together with the
+    scheme catalog version and the risk model version.
+    """
+    relevant = {k: v for k, v in profile_data.items() if k not in DOCUMENT_FIELDS}
+    payload = json.dumps([relevant, catalog_version, model_version], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def record_profile_save(skipped):
+    """Counts profile saves and publishes the recomputation skip rate."""
+    metrics.inc("profile_saves_total", result="skipped" if skipped else "recomputed")
+    skips = metrics.get_counter("profile_saves_total", result="skipped")
+    total = skips + metrics.get_counter("profile_saves_total", result="recomputed")
+    metrics.set_gauge("profile_recompute_skip_ratio", round(skips / total, 4))
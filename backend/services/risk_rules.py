@@ -0,0 +1,88 @@
+"""
+Array versions of the rule-based health and financial risk calculators.
+
+They take one NumPy column per input and return a score per row, adding the
+same increments in the same order as AIEngine.calculate_health_risk /
+calculate_financial_risk, so the results are bit-for-bit identical.
+Text columns (occupation, employment status) are reduced to their distinct
+values first, and the keyword tests run once per distinct value.
+"""
+import numpy as np
+
+HAZARDOUS_OCCUPATIONS = ['construction', 'mining', 'driver', 'hazard', 'laborer', 'factory']
+
+
+def _lower_codes(values):
+    """Distinct lowercased values and the code of every row."""
+    lowered = np.array([(v or "").lower() for v in values], dtype=object)
+    if not len(lowered):
+        return np.array([], dtype=object), np.zeros(0, dtype=np.intp)
+    uniq, codes = np.unique(lowered, return_inverse=True)
+    return uniq, codes
+
+
+def _flag(uniq, codes, test):
+    return np.array([test(v) for v in uniq], dtype=bool)[codes] if len(codes) else np.zeros(0, dtype=bool)
+
+
+def financial_risk_array(income, occupation, employment_status, family_size, single_parent_child):
+    """
+    income, family_size: numeric columns; occupation, employment_status: text
+    columns; single_parent_child: boolean column.
+    """
+    income = np.asarray(income, dtype=np.float64)
+    family_size = np.asarray(family_size, dtype=np.float64)
+    occ, occ_codes = _lower_codes(occupation)
+    emp, emp_codes = _lower_codes(employment_status)
+
+    score = np.full(len(income), 0.1)
+
+    # Income factors
+    score = score + np.select(
+        [income <= 0, income < 50000, income < 150000, income < 300000],
+        [0.5, 0.4, 0.25, 0.1],
+        default=0.0,
+    )
+
+    # Employment factors
+    unemployed = _flag(emp, emp_codes, lambda v: v == 'unemployed') & ~_flag(occ, occ_codes, lambda v: 'student' in v)
+    score = score + np.where(unemployed, 0.2, 0.0)
+    score = score + np.where(_flag(occ, occ_codes, lambda v: 'laborer' in v or 'worker' in v or 'vendor' in v), 0.15, 0.0)
+    score = score + np.where(_flag(occ, occ_codes, lambda v: 'farmer' in v), 0.1, 0.0)
+
+    # Dependency burden
+    score = score + np.where(family_size > 4, 0.1, 0.0)
+    score = score + np.where(np.asarray(single_parent_child, dtype=bool), 0.15, 0.0)
+
+    return np.minimum(np.maximum(score, 0.05), 0.99)
+
+
+def health_risk_array(age, disability, occupation, income):
+    """
+    age, income: numeric columns; disability: boolean column;
+    occupation: text column.
+    """
+    age = np.asarray(age, dtype=np.float64)
+    income = np.asarray(income, dtype=np.float64)
+    occ, occ_codes = _lower_codes(occupation)
+
+    score = np.full(len(age), 0.1)
+
+    # Age factors
+    score = score + np.select(
+        [age > 70, age > 60, age > 50, age < 5, age < 18],
+        [0.6, 0.4, 0.2, 0.3, 0.1],
+        default=0.0,
+    )
+
+    # Physical factors
+    score = score + np.where(np.asarray(disability, dtype=bool), 0.4, 0.0)
+
+    # Occupational Health Risk
+    hazardous = _flag(occ, occ_codes, lambda v: any(x in v for x in HAZARDOUS_OCCUPATIONS))
+    score = score + np.where(hazardous, 0.2, 0.0)
+
+    # Socio-economic link
+    score = score + np.where(income < 100000, 0.1, 0.0)
+
+    return np.minimum(np.maximum(score, 0.05), 0.99)
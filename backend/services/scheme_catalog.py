@@ -0,0 +1,154 @@
+"""
+Shared in-memory scheme catalog.
+
+The catalog only changes through POST /schemes/ and the seed scripts, so the
+schemes and citizen routers read it from this process-wide cache instead of
+querying the schemes table on every request. create_scheme invalidates it
+after committing; the TTL picks up changes made out-of-process (seed scripts).
+
+When caching is disabled (or SCHEME_PREFILTER=sql) the matcher does not load
+the whole catalog: the cheap hard filters (age window, max_income,
+required_gender) are pushed into the SQL query and only the surviving
+candidates are compiled.
+"""
+import hashlib
+import os
+import threading
+import time
+
+from sqlalchemy import func, or_
+
+import models
+from services import metrics
+from services.scheme_matcher import FEMALE_GENDERS, MALE_GENDERS, compile_catalog
+
+# Seconds before a cached catalog is reloaded. 0 disables caching.
+CATALOG_TTL = float(os.getenv("SCHEME_CATALOG_TTL", "300"))
+
+# "auto" (SQL prefilter only when caching is disabled), "memory" or "sql"
+SCHEME_PREFILTER = os.getenv("SCHEME_PREFILTER", "auto")
+
+SCHEME_COLUMNS = [c.name for c in models.Scheme.__table__.columns]
+
+
+class SchemeRecord:
+    """
+    Detached, read-only copy of a Scheme row.
+    Safe to share across sessions and threads.
+    """
+    __slots__ = SCHEME_COLUMNS
+
+    def __init__(self, scheme):
+        for col in SCHEME_COLUMNS:
+            setattr(self, col, getattr(scheme, col))
+
+
+class CatalogSnapshot:
+    def __init__(self, schemes):
+        self.schemes = [SchemeRecord(s) for s in schemes]
+        self.compiled = compile_catalog(self.schemes)
+        self.version = self._content_hash(self.schemes)
+        self.loaded_at = time.monotonic()
+
+    @staticmethod
+    def _content_hash(schemes):
+        digest = hashlib.sha1()
+        for s in schemes:
+            digest.update(repr(tuple(getattr(s, col) for col in SCHEME_COLUMNS)).encode("utf-8"))
+        return digest.hexdigest()[:16]
+
+
+def prefilter_clauses(profile):
+    """
+    SQL WHERE clauses for the hard filters. The age and income limits can use
+    the scheme indexes; the required_gender test compares lower() and is not
+    indexed, it only shrinks the candidate set.
+    Null / 0 limits mean "no limit", matching the matcher's semantics, so the
+    result is always a superset of the schemes the matcher accepts.
+    """
+    S = models.Scheme
+    clauses = []
+    if profile.age is not None:
+        clauses.append(or_(S.min_age.is_(None), S.min_age == 0, S.min_age <= profile.age))
+        clauses.append(or_(S.max_age.is_(None), S.max_age == 0, S.max_age >= profile.age))
+    if profile.income is not None:
+        clauses.append(or_(S.max_income.is_(None), S.max_income == 0, S.max_income >= profile.income))
+
+    gender = (profile.gender or "").lower()
+    if gender == "male":
+        clauses.append(or_(S.required_gender.is_(None), func.lower(S.required_gender).notin_(FEMALE_GENDERS)))
+    elif gender == "female":
+        clauses.append(or_(S.required_gender.is_(None), func.lower(S.required_gender).notin_(MALE_GENDERS)))
+    return clauses
+
+
+class SchemeCatalog:
+    def __init__(self, ttl=CATALOG_TTL, prefilter=SCHEME_PREFILTER):
+        self.ttl = ttl
+        self.prefilter = prefilter
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, snapshot):
+        return snapshot is not None and self.ttl > 0 and time.monotonic() - snapshot.loaded_at < self.ttl
+
+    def get(self, db):
+        """Returns the current CatalogSnapshot, loading it from the database on a miss."""
+        snapshot = self._snapshot
+        if self._is_fresh(snapshot):
+            metrics.inc("scheme_catalog_requests_total", result="hit")
+            return snapshot
+
+        with self._lock:
+            # Another thread may have reloaded while we waited
+            snapshot = self._snapshot
+            if self._is_fresh(snapshot):
+                metrics.inc("scheme_catalog_requests_total", result="hit")
+                return snapshot
+
+            metrics.inc("scheme_catalog_requests_total", result="miss")
+            snapshot = CatalogSnapshot(db.query(models.Scheme).order_by(models.Scheme.id).all())
+            self._snapshot = snapshot
+            metrics.set_gauge("scheme_catalog_size", len(snapshot.schemes))
+            return snapshot
+
+    def use_sql_prefilter(self):
+        return self.prefilter == "sql" or (self.prefilter == "auto" and self.ttl <= 0)
+
+    def version(self, db):
+        """Catalog version for fingerprints, or None when the catalog is not cached."""
+        if self.ttl <= 0:
+            return None
+        return self.get(db).version
+
+    def candidates(self, db, profile):
+        """
+        Compiled catalog of the schemes that can match `profile`: the cached
+        catalog, or only the rows that survive the SQL prefilter.
+        """
+        if not self.use_sql_prefilter():
+            return self.get(db).compiled
+
+        rows = db.query(models.Scheme).filter(*prefilter_clauses(profile)).order_by(models.Scheme.id).all()
+        metrics.observe("scheme_prefilter_candidates", len(rows), buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000))
+        return compile_catalog([SchemeRecord(s) for s in rows])
+
+    def invalidate(self):
+        """Drops the cached snapshot; the next get() reloads from the database."""
+        with self._lock:
+            self._snapshot = None
+        metrics.inc("scheme_catalog_invalidations_total")
+
+    def stats(self):
+        hits = metrics.get_counter("scheme_catalog_requests_total", result="hit")
+        misses = metrics.get_counter("scheme_catalog_requests_total", result="miss")
+        snapshot = self._snapshot
+        return {
+            "hits": hits,
+            "misses": misses,
+            "version": snapshot.version if snapshot else None,
+            "size": len(snapshot.schemes) if snapshot else 0,
+        }
+
+
+scheme_catalog = SchemeCatalog()
@@ -0,0 +1,423 @@
+"""
+Scheme matching engine.
+
+The scheme catalog is compiled once into CompiledScheme records so the
+per-profile matcher only does plain field comparisons instead of rebuilding
+and scanning the scheme text for every scheme on every profile save.
+
+The hard filters are additionally held as NumPy columns so one profile is
+checked against the whole catalog in a few array operations. The original
+per-scheme loop is kept as the "loop" reference mode.
+
+Schemes with structured JSON eligibility rules (services.eligibility_rules)
+are compiled from those rules; free-text schemes fall back to the keyword
+heuristics below.
+"""
+import os
+
+import numpy as np
+
+from services.eligibility_rules import (
+    ENUM_KEYS, FARMER_KEYWORDS, FARMER_OCCUPATIONS, FEMALE_GENDERS, MALE_GENDERS, STUDENT_KEYWORDS,
+    VENDOR_KEYWORDS, VENDOR_OCCUPATIONS, WOMEN_KEYWORDS, enum_value_matches, parse_rules, validate_rules,
+)
+
+# "vectorized" (default) or "loop" (reference implementation)
+MATCHER_MODE = os.getenv("MATCHER_MODE", "vectorized")
+
+WELFARE_CATEGORIES = ["Health", "Pension", "Housing", "Rural Development"]
+GENERAL_CATEGORIES = ["Skill Development", "Health", "Employment"]
+
+MAX_CONFIDENCE = 0.99
+
+
+class CompiledScheme:
+    """
+    Pre-computed predicate record for a single scheme.
+    All text heuristics are evaluated here, once per scheme.
+    """
+    __slots__ = (
+        "id", "scheme_name", "description", "category",
+        "min_age", "max_age", "max_income",
+        "required_gender", "female_only", "male_only", "women_targeted",
+        "farmer_only", "vendor_only", "student_only",
+        "sc_only", "st_only", "obc_only", "minority_only",
+        "structured", "enums", "excluded_genders", "requires_student", "requires_minority", "requires_disability",
+        "rural_signal", "student_signal", "agri_signal",
+        "welfare_category", "general_category",
+    )
+
+    def __init__(self, scheme):
+        self.id = scheme.id
+        self.scheme_name = scheme.scheme_name or ""
+        self.description = scheme.description or ""
+        self.category = scheme.category
+
+        rules = parse_rules(scheme.eligibility_rules)
+        if rules is not None:
+            try:
+                validate_rules(rules)
+            except ValueError as e:
+                print(f"Invalid eligibility rules for scheme {scheme.id}, using text heuristics: {e}")
+                rules = None
+        self.structured = rules is not None
+        rules = rules or {}
+        rules_text = rules.get("text", "") if self.structured else (scheme.eligibility_rules or "")
+
+        # Falsy limits (None / 0) are treated as "no limit", same as the original filters.
+        # Structured ranges can only tighten the column limits.
+        age_range = rules.get("age", {})
+        self.min_age = _tightest(max, scheme.min_age, age_range.get("min"))
+        self.max_age = _tightest(min, scheme.max_age, age_range.get("max"))
+        self.max_income = _tightest(min, scheme.max_income, rules.get("income", {}).get("max"))
+
+        # Gender restrictions
+        self.required_gender = (scheme.required_gender or "").lower()
+        self.female_only = self.required_gender in FEMALE_GENDERS
+        self.male_only = self.required_gender in MALE_GENDERS
+
+        # Structured enum rules and flags
+        self.enums = {key: frozenset(v.lower() for v in rules[key]) for key in ENUM_KEYS if rules.get(key)}
+        self.excluded_genders = frozenset(v.lower() for v in rules.get("exclude_gender", ()))
+        self.requires_student = bool(rules.get("student"))
+        self.requires_minority = bool(rules.get("minority"))
+        self.requires_disability = bool(rules.get("disability"))
+
+        # Occupation / social category restrictions (keyword heuristics, free-text rules only)
+        scheme_text = (self.scheme_name + " " + self.description + " " + rules_text).lower()
+        heuristics = not self.structured
+        check_text = ((scheme.category or "") + " " + self.scheme_name).lower()
+        self.women_targeted = heuristics and any(w in check_text for w in WOMEN_KEYWORDS)
+        self.farmer_only = heuristics and any(x in scheme_text for x in FARMER_KEYWORDS)
+        self.vendor_only = heuristics and any(x in scheme_text for x in VENDOR_KEYWORDS)
+        self.student_only = heuristics and any(x in scheme_text for x in STUDENT_KEYWORDS)
+        self.sc_only = heuristics and ("sc " in scheme_text or "scheduled caste" in scheme_text)
+        self.st_only = heuristics and ("st " in scheme_text or "scheduled tribe" in scheme_text)
+        self.obc_only = heuristics and ("obc" in scheme_text or "backward class" in scheme_text)
+        self.minority_only = heuristics and "minority" in scheme_text
+
+        # Positive signals
+        self.rural_signal = "Rural" in self.description
+        self.student_signal = "student" in scheme_text
+        self.agri_signal = "agriculture" in scheme_text
+        self.welfare_category = self.category in WELFARE_CATEGORIES
+        self.general_category = self.category in GENERAL_CATEGORIES
+
+
+def _tightest(pick, column, rule):
+    limits = [v for v in (column, rule) if v]
+    return pick(limits) if limits else None
+
+
+# Eligibility reason codes, in the order the hard filters are evaluated
+REASON_ELIGIBLE = 0
+REASON_GENDER = 1
+REASON_MIN_AGE = 2
+REASON_MAX_AGE = 3
+REASON_INCOME = 4
+REASON_OCCUPATION = 5
+REASON_STUDENT = 6
+REASON_COMMUNITY = 7
+REASON_AREA = 8
+REASON_DISABILITY = 9
+
+REASON_LABELS = {
+    REASON_ELIGIBLE: "eligible",
+    REASON_GENDER: "gender",
+    REASON_MIN_AGE: "below_min_age",
+    REASON_MAX_AGE: "above_max_age",
+    REASON_INCOME: "above_max_income",
+    REASON_OCCUPATION: "occupation",
+    REASON_STUDENT: "not_student",
+    REASON_COMMUNITY: "community",
+    REASON_AREA: "area_of_residence",
+    REASON_DISABILITY: "disability",
+}
+
+
+class CatalogArrays:
+    """
+    Column-oriented view of the compiled catalog.
+    Missing numeric limits are stored as NaN so comparisons against them are False.
+    """
+    def __init__(self, rules):
+        self.min_age = np.array([s.min_age if s.min_age else np.nan for s in rules], dtype=np.float64)
+        self.max_age = np.array([s.max_age if s.max_age else np.nan for s in rules], dtype=np.float64)
+        self.max_income = np.array([s.max_income if s.max_income else np.nan for s in rules], dtype=np.float64)
+
+        def flags(attr):
+            return np.array([getattr(s, attr) for s in rules], dtype=bool)
+
+        self.female_only = flags("female_only")
+        # Schemes x genders matrix of exclude_gender rules
+        self.excluded_gender_vocab = {g: i for i, g in enumerate(sorted({g for s in rules for g in s.excluded_genders}))}
+        self.excluded_genders = np.zeros((len(rules), len(self.excluded_gender_vocab)), dtype=bool)
+        for row, s in enumerate(rules):
+            for g in s.excluded_genders:
+                self.excluded_genders[row, self.excluded_gender_vocab[g]] = True
+        self.male_only = flags("male_only")
+        self.women_targeted = flags("women_targeted")
+        self.farmer_only = flags("farmer_only")
+        self.vendor_only = flags("vendor_only")
+        self.student_only = flags("student_only")
+        self.sc_only = flags("sc_only")
+        self.st_only = flags("st_only")
+        self.obc_only = flags("obc_only")
+        self.minority_only = flags("minority_only")
+        self.requires_student = flags("requires_student")
+        self.requires_minority = flags("requires_minority")
+        self.requires_disability = flags("requires_disability")
+        self.enums = {key: EnumColumn(rules, key) for key in ENUM_KEYS}
+
+
+class EnumColumn:
+    """
+    One structured enum rule across the catalog: a (schemes x values) matrix
+    of allowed values, so a profile is tested once per distinct value.
+    """
+    def __init__(self, rules, key):
+        self.key = key
+        self.vocab = sorted({v for s in rules for v in s.enums.get(key, ())})
+        index = {v: i for i, v in enumerate(self.vocab)}
+        self.has_rule = np.array([key in s.enums for s in rules], dtype=bool)
+        self.allowed = np.zeros((len(rules), len(self.vocab)), dtype=bool)
+        for row, s in enumerate(rules):
+            for v in s.enums.get(key, ()):
+                self.allowed[row, index[v]] = True
+
+    def blocked(self, profile_value):
+        """Schemes whose rule on this field rejects the profile value."""
+        satisfied = np.array([enum_value_matches(self.key, v, profile_value) for v in self.vocab], dtype=bool)
+        return self.has_rule & ~(self.allowed & satisfied).any(axis=1)
+
+
+class CompiledCatalog:
+    def __init__(self, rules):
+        self.rules = rules
+        self.arrays = CatalogArrays(rules)
+        self.names = {s.id: s.scheme_name for s in rules}
+
+    def __len__(self):
+        return len(self.rules)
+
+
+def compile_catalog(schemes):
+    """Compiles a list of Scheme rows into a CompiledCatalog."""
+    return CompiledCatalog([CompiledScheme(s) for s in schemes])
+
+
+class ProfileFacts:
+    """
+    Profile attributes normalized once per match run.
+    """
+    def __init__(self, profile):
+        self.age = profile.age
+        self.income = profile.income
+        self.gender = profile.gender
+        self.gender_lower = (profile.gender or "").lower()
+        self.is_male = self.gender_lower == "male"
+        self.is_female = self.gender_lower == "female"
+
+        occupation = (profile.occupation or "").lower()
+        self.is_farmer = any(x in occupation for x in FARMER_OCCUPATIONS)
+        self.is_vendor = any(x in occupation for x in VENDOR_OCCUPATIONS)
+        self.occupation_farmer = "farmer" in occupation
+
+        self.is_student = (profile.is_student or "No") != "No"
+        self.is_student_yes = profile.is_student == "Yes"
+
+        self.community = profile.community
+        community = (profile.community or "General").lower()
+        self.is_sc = "sc" in community
+        self.is_st = "st" in community
+        self.is_obc = "obc" in community
+        self.is_minority = (profile.minority_status or "No") == "Yes"
+        self.is_rural = profile.location_type == "Rural"
+        self.has_disability = bool(profile.disability_status)
+
+        # Raw values for structured enum rules
+        self.enum_values = {key: getattr(profile, key) for key in ENUM_KEYS}
+
+    def allows(self, s, key):
+        """True if the scheme has no rule on `key` or the profile satisfies it."""
+        allowed = s.enums.get(key)
+        return not allowed or any(enum_value_matches(key, v, self.enum_values[key]) for v in allowed)
+
+
+def is_excluded(p, s):
+    """Strict exclusion criteria (hard filters)."""
+    # 1. Gender
+    if p.is_male and (s.female_only or s.women_targeted):
+        return True
+    if p.is_female and s.male_only:
+        return True
+    if not p.allows(s, "gender") or p.gender_lower in s.excluded_genders:
+        return True
+
+    # 2. Age
+    if s.min_age and p.age < s.min_age:
+        return True
+    if s.max_age and p.age > s.max_age:
+        return True
+
+    # 3. Income
+    if s.max_income and p.income > s.max_income:
+        return True
+
+    # 4. Occupation
+    if s.farmer_only and not p.is_farmer:
+        return True
+    if s.vendor_only and not p.is_vendor:
+        return True
+    if not p.allows(s, "occupation"):
+        return True
+    if not p.allows(s, "area_of_residence"):
+        return True
+
+    # 5. Student / Education
+    if (s.student_only or s.requires_student) and not p.is_student:
+        return True
+
+    # 6. Community / Social Category
+    if s.sc_only and not p.is_sc:
+        return True
+    if s.st_only and not p.is_st:
+        return True
+    if s.obc_only and not p.is_obc:
+        return True
+    if (s.minority_only or s.requires_minority) and not p.is_minority:
+        return True
+    if not p.allows(s, "community"):
+        return True
+
+    # 7. Disability
+    if s.requires_disability and not p.has_disability:
+        return True
+
+    return False
+
+
+def eligibility_mask(p, arrays):
+    """
+    Evaluates the hard filters for one profile against the whole catalog.
+    Returns (mask, reasons): a boolean eligibility mask and, per scheme, the
+    code of the first filter that excluded it (REASON_ELIGIBLE if none).
+    """
+    a = arrays
+    age = float(p.age)
+    income = float(p.income)
+
+    gender_block = a.enums["gender"].blocked(p.enum_values["gender"])
+    if p.gender_lower in a.excluded_gender_vocab:
+        gender_block = gender_block | a.excluded_genders[:, a.excluded_gender_vocab[p.gender_lower]]
+    if p.is_male:
+        gender_block = gender_block | a.female_only | a.women_targeted
+    elif p.is_female:
+        gender_block = gender_block | a.male_only
+
+    occupation_block = (
+        (a.farmer_only & (not p.is_farmer))
+        | (a.vendor_only & (not p.is_vendor))
+        | a.enums["occupation"].blocked(p.enum_values["occupation"])
+    )
+    community_block = (
+        (a.sc_only & (not p.is_sc))
+        | (a.st_only & (not p.is_st))
+        | (a.obc_only & (not p.is_obc))
+        | ((a.minority_only | a.requires_minority) & (not p.is_minority))
+        | a.enums["community"].blocked(p.enum_values["community"])
+    )
+
+    # np.select picks the first matching condition, mirroring the loop order
+    reasons = np.select(
+        [
+            gender_block,
+            age < a.min_age,
+            age > a.max_age,
+            income > a.max_income,
+            occupation_block,
+            a.enums["area_of_residence"].blocked(p.enum_values["area_of_residence"]),
+            (a.student_only | a.requires_student) & (not p.is_student),
+            community_block,
+            a.requires_disability & (not p.has_disability),
+        ],
+        [REASON_GENDER, REASON_MIN_AGE, REASON_MAX_AGE, REASON_INCOME,
+         REASON_OCCUPATION, REASON_AREA, REASON_STUDENT, REASON_COMMUNITY, REASON_DISABILITY],
+        default=REASON_ELIGIBLE,
+    ).astype(np.int8)
+    return reasons == REASON_ELIGIBLE, reasons
+
+
+def match_reasons(p, s, score):
+    """
+    Positive-signal logic for a scheme that passed the hard filters.
+    Returns the list of reasons, or None if the scheme is not a match.
+    """
+    match = False
+    reasons = []
+
+    if s.min_age and p.age >= s.min_age:
+        reasons.append(f"Eligible for age {p.age}")
+
+    if s.max_income and p.income <= s.max_income:
+        reasons.append(f"Income ₹{p.income} fits limit")
+
+    if s.required_gender and p.gender_lower == s.required_gender:
+        match = True
+        reasons.append(f"Dedicated benefit for {p.gender}")
+
+    if s.rural_signal and p.is_rural:
+        match = True
+        reasons.append("Rural area support")
+
+    if p.community and (p.community in s.scheme_name or p.community in s.description):
+        match = True
+        reasons.append(f"Targeted for {p.community} category")
+
+    if s.student_signal and p.is_student_yes:
+        match = True
+        reasons.append("Student benefit")
+
+    if s.agri_signal and p.occupation_farmer:
+        match = True
+        reasons.append("Farmer benefit")
+
+    # Only auto-match high risk for general welfare / health schemes
+    if score > 0.6 and s.welfare_category:
+        match = True
+        reasons.append("High priority welfare match")
+
+    # Generic categories are open to all once no hard block was hit
+    if not match and s.general_category:
+        match = True
+        reasons.append(f"General eligibility for {s.category}")
+
+    return reasons if match else None
+
+
+def fallback_confidence(score):
+    """Rule-based match confidence from the profile score; works on arrays too."""
+    return np.minimum(0.8 + score * 0.1, MAX_CONFIDENCE)
+
+
+def match_schemes(profile, catalog, score, mode=None):
+    """
+    Matches a profile against a CompiledCatalog.
+    Returns a list of (scheme_id, confidence_score, reason) tuples.
+    """
+    p = ProfileFacts(profile)
+    confidence = float(fallback_confidence(score))
+    mode = mode or MATCHER_MODE
+
+    if mode == "loop":
+        candidates = [s for s in catalog.rules if not is_excluded(p, s)]
+    else:
+        mask, _ = eligibility_mask(p, catalog.arrays)
+        candidates = [catalog.rules[i] for i in np.flatnonzero(mask)]
+
+    matches = []
+    for s in candidates:
+        reasons = match_reasons(p, s, score)
+        if reasons is not None:
+            matches.append((s.id, confidence, " and ".join(reasons[:2]) or "AI predicted match based on profile"))
+    return matches
@@ -0,0 +1,87 @@
+"""
+Model-derived confidence and ranking for scheme recommendations.
+
+The risk model is trained with scheme_name as a feature, so every matched
+scheme the encoder knows is scored as its own scheme context instead of all
+matches sharing one rule-based confidence. The contexts of one profile (or
+of a whole bulk chunk) go to the model as a single matrix.
+
+Both kinds of confidence use scheme_matcher.fallback_confidence(): the model
+score of the scheme, or the profile's rule-based score for schemes the model
+has never seen, mapped onto 0.8-0.9. Stored confidence_score values are
+therefore on one scale, and the order among model-scored schemes is the
+model's order.
+"""
+from sqlalchemy import select
+
+import models
+from services.ai_engine import ai_engine, profile_to_ai_input, scheme_batcher
+from services.scheme_matcher import fallback_confidence
+
+P = models.CitizenProfile
+# Profile columns read by model_input()
+MODEL_INPUT_COLUMNS = [
+    P.age, P.income, P.family_size, P.disability_status, P.education, P.occupation,
+    P.employment_status, P.is_student, P.location_state, P.area_of_residence,
+    P.community, P.gender, P.single_parent_child,
+]
+
+
+def model_input(profile):
+    """Risk model input for a profile-like object."""
+    data = profile_to_ai_input(profile)
+    # Used by the model but not by the rule-based calculators
+    data["single_parent_child"] = getattr(profile, "single_parent_child", None) or "No"
+    return data
+
+
+def _confidence(model_score, fallback):
+    # Same scale as the fallback, so the two can be ranked together
+    return fallback if model_score is None else float(fallback_confidence(model_score))
+
+
+def _apply_scores(matches, scores):
+    ranked = [
+        (scheme_id, _confidence(model_score, confidence), reason)
+        for (scheme_id, confidence, reason), model_score in zip(matches, scores)
+    ]
+    # Stable, so ties keep the catalog order
+    ranked.sort(key=lambda m: -m[1])
+    return ranked
+
+
+def rank_matches(profile, matches, scheme_names):
+    """
+    Re-scores one profile's (scheme_id, confidence, reason) matches with the
+    model and returns them ordered by confidence. scheme_names maps scheme id
+    to name (CompiledCatalog.names).
+    """
+    if not matches:
+        return []
+    names = [scheme_names[scheme_id] for scheme_id, _, _ in matches]
+    scores = scheme_batcher.submit_threadsafe((model_input(profile), names))
+    return _apply_scores(matches, scores)
+
+
+def rank_matches_batch(items, scheme_names):
+    """rank_matches() for many (profile, matches) pairs with one model call."""
+    scores = ai_engine.predict_scheme_scores_batch([
+        (model_input(profile), [scheme_names[scheme_id] for scheme_id, _, _ in matches])
+        for profile, matches in items
+    ])
+    return [_apply_scores(matches, s) for (_, matches), s in zip(items, scores)]
+
+
+def scheme_confidences(db, scheme_name, user_ids, fallback):
+    """
+    Model confidence of one scheme for the stored profiles of user_ids;
+    `fallback` holds the rule-based confidence for each user.
+    """
+    if scheme_name not in ai_engine.scheme_vocabulary():
+        return list(fallback)
+    rows = db.execute(
+        select(P.user_id, *MODEL_INPUT_COLUMNS).where(P.user_id.in_([int(u) for u in user_ids]))
+    ).all()
+    inputs = {row.user_id: model_input(row) for row in rows}
+    scores = ai_engine.predict_scheme_scores_batch([(inputs[u], [scheme_name]) for u in user_ids])
+    return [_confidence(s[0], f) for s, f in zip(scores, fallback)]
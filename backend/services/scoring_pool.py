@@ -0,0 +1,122 @@
+"""
+Risk scoring and scheme matching for a profile save, optionally in a
+process pool.
+
+score_and_match() is plain CPU-bound Python and holds the GIL, so with
+SCORING_POOL=1 the citizen route hands it to a ProcessPoolExecutor instead
+of running it in the request thread. Each worker warms the model and loads
+the compiled scheme catalog once, switching either only when the parent
+reports a different model or catalog version (e.g. after POST
+/admin/model/reload or /rollback), receives the profile as a plain dict and
+returns a compact (health, financial, matches) tuple.
+
+Without a cached catalog (SQL prefilter mode) matching stays in-process.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from types import SimpleNamespace
+
+import models
+from services.ai_engine import ai_engine, profile_to_ai_input
+from services.scheme_catalog import scheme_catalog
+from services.scheme_matcher import match_schemes
+from services.scheme_ranking import rank_matches
+
+ENABLED = os.getenv("SCORING_POOL", "0") == "1"
+WORKERS = int(os.getenv("SCORING_POOL_WORKERS", str(os.cpu_count() or 2)))
+
+PROFILE_COLUMNS = [c.name for c in models.CitizenProfile.__table__.columns]
+
+
+def score_and_match(profile, compiled):
+    """Returns (health_risk, financial_risk, matches) for a profile-like object."""
+    ai_input = profile_to_ai_input(profile)
+    h_score = ai_engine.calculate_health_risk(ai_input)
+    f_score = ai_engine.calculate_financial_risk(ai_input)
+    # Use average for scheme boosting logic
+    score = (h_score + f_score) / 2
+    matches = match_schemes(profile, compiled, score)
+    # One model call scores every matched scheme as its own context
+    matches = rank_matches(profile, matches, compiled.names)
+    return h_score, f_score, tuple(matches)
+
+
+# --- worker process side ---
+
+# CatalogSnapshot last loaded by this worker; its own version is what gets compared
+_worker_catalog = None
+
+
+def _init_worker():
+    ai_engine.warm_up()
+
+
+def _worker_compiled_catalog(version):
+    global _worker_catalog
+    if _worker_catalog is None or _worker_catalog.version != version:
+        import database
+
+        db = database.SessionLocal()
+        try:
+            scheme_catalog.invalidate()
+            # The database may hold a newer catalog than the one requested, so the
+            # snapshot is cached under its own version
+            _worker_catalog = scheme_catalog.get(db)
+        finally:
+            db.close()
+    return _worker_catalog.compiled
+
+
+def _worker_follow_model(version):
+    # "fallback": the parent has no model either, keep the worker as it is
+    if version != "fallback" and version != ai_engine.loaded_version():
+        ai_engine.follow(version)
+
+
+def _worker_score_and_match(values, catalog_version, model_version):
+    _worker_follow_model(model_version)
+    return score_and_match(SimpleNamespace(**values), _worker_compiled_catalog(catalog_version))
+
+
+# --- request side ---
+
+class ScoringPool:
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: workers must not inherit the parent's DB connections and threads
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                    )
+        return self._executor
+
+    def score_and_match(self, profile, snapshot):
+        values = {col: getattr(profile, col) for col in PROFILE_COLUMNS}
+        return self._get_executor().submit(
+            _worker_score_and_match, values, snapshot.version, ai_engine.model_version
+        ).result()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+scoring_pool = ScoringPool()
+
+
+def compute_profile_matches(db, profile):
+    """Scores and matches a profile, in the process pool when enabled."""
+    if ENABLED and not scheme_catalog.use_sql_prefilter():
+        return scoring_pool.score_and_match(profile, scheme_catalog.get(db))
+    return score_and_match(profile, scheme_catalog.candidates(db, profile))
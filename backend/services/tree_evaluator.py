@@ -0,0 +1,130 @@
+"""
+NumPy evaluator for an exported XGBoost tree ensemble.
+
+The trees of a trained booster are flattened into parallel arrays indexed by
+a global node id (feature, threshold, left, right, default_left, value) plus
+the root id of every tree. Leaves point to themselves, so every row can walk
+every tree for `max_depth` steps with a handful of array operations.
+
+Categorical splits (native categorical features) keep their category set as
+a row of a boolean table: a category in the set goes right, anything else
+(including codes outside the table) goes left, as in XGBoost.
+
+Only single-target regression is supported. services.model_artifacts writes
+the arrays (trees.npz); this module does not import xgboost.
+"""
+import json
+
+import numpy as np
+
+ARRAY_KEYS = ["feature", "threshold", "left", "right", "default_left", "value", "roots"]
+# Absent from files written before categorical splits were supported
+CATEGORICAL_KEYS = ["cat_index", "cat_sets"]
+
+
+class TreeEnsemble:
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, base_score, max_depth,
+                 cat_index=None, cat_sets=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float32)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float32)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.base_score = np.float32(base_score)
+        self.max_depth = int(max_depth)
+        # Row of cat_sets for categorical split nodes, -1 for numerical splits and leaves
+        self.cat_index = np.full(len(self.feature), -1, dtype=np.int32) if cat_index is None else np.asarray(cat_index, dtype=np.int32)
+        self.cat_sets = np.zeros((0, 0), dtype=bool) if cat_sets is None else np.asarray(cat_sets, dtype=bool)
+
+    @classmethod
+    def from_booster_json(cls, raw):
+        """Builds the arrays from Booster.save_raw(raw_format="json") output."""
+        learner = json.loads(raw)["learner"]
+        objective = learner["objective"]["name"]
+        if not objective.startswith("reg:"):
+            raise ValueError(f"Unsupported objective: {objective}")
+        # Stored as e.g. "[8.462947E-1]" by recent versions
+        base_score = float(learner["learner_model_param"]["base_score"].strip("[]"))
+
+        feature, threshold, left, right, default_left, value, roots = [], [], [], [], [], [], []
+        cat_index, categories = [], []
+        max_depth = 0
+        for tree in learner["gradient_booster"]["model"]["trees"]:
+            offset = len(feature)
+            roots.append(offset)
+            cat_index.extend([-1] * len(tree["left_children"]))
+            for node, begin, size in zip(tree.get("categories_nodes", []), tree.get("categories_segments", []), tree.get("categories_sizes", [])):
+                cat_index[offset + node] = len(categories)
+                categories.append(tree["categories"][begin:begin + size])
+            depth = {0: 0}
+            for node, (l, r) in enumerate(zip(tree["left_children"], tree["right_children"])):
+                if l == -1:
+                    # Leaf: split_conditions holds the leaf weight
+                    feature.append(0)
+                    threshold.append(0.0)
+                    left.append(offset + node)
+                    right.append(offset + node)
+                    value.append(tree["split_conditions"][node])
+                else:
+                    feature.append(tree["split_indices"][node])
+                    threshold.append(tree["split_conditions"][node])
+                    left.append(offset + l)
+                    right.append(offset + r)
+                    value.append(0.0)
+                    depth[l] = depth[r] = depth[node] + 1
+                    max_depth = max(max_depth, depth[node] + 1)
+                default_left.append(bool(tree["default_left"][node]))
+
+        width = max((max(c) + 1 for c in categories if c), default=0)
+        cat_sets = np.zeros((len(categories), width), dtype=bool)
+        for row, cats in enumerate(categories):
+            cat_sets[row, cats] = True
+
+        return cls(feature, threshold, left, right, default_left, value, roots, base_score, max_depth, cat_index, cat_sets)
+
+    def predict(self, X):
+        """Predictions for a (n_rows, n_features) matrix; NaN means missing."""
+        X = np.asarray(X, dtype=np.float32)
+        n = X.shape[0]
+        rows = np.arange(n)[:, None]
+        node = np.broadcast_to(self.roots, (n, len(self.roots)))
+        categorical = len(self.cat_sets) > 0
+        for _ in range(self.max_depth):
+            x = X[rows, self.feature[node]]
+            go_left = x < self.threshold[node]
+            if categorical:
+                go_left = np.where(self.cat_index[node] >= 0, ~self._in_category_set(node, x), go_left)
+            go_left = np.where(np.isnan(x), self.default_left[node], go_left)
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.base_score + self.value[node].sum(axis=1, dtype=np.float32)
+
+    def _in_category_set(self, node, x):
+        """Whether category code x is in the set of categorical split `node`."""
+        width = self.cat_sets.shape[1]
+        valid = (x >= 0) & (x < width) & (x == np.floor(x))
+        code = np.where(valid, x, 0).astype(np.int64)
+        return valid & self.cat_sets[np.maximum(self.cat_index[node], 0), code]
+
+    def arrays(self):
+        return {key: getattr(self, key) for key in ARRAY_KEYS + CATEGORICAL_KEYS}
+
+    def save(self, path, **extra):
+        """Writes the arrays (and any extra arrays) to an .npz file."""
+        np.savez(
+            path,
+            base_score=np.float32(self.base_score),
+            max_depth=np.int32(self.max_depth),
+            **self.arrays(),
+            **extra,
+        )
+
+    @classmethod
+    def from_npz(cls, data):
+        return cls(
+            *(data[key] for key in ARRAY_KEYS),
+            base_score=data["base_score"],
+            max_depth=data["max_depth"],
+            **{key: data[key] for key in CATEGORICAL_KEYS if key in data},
+        )